@@ -1,15 +1,76 @@
 import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
 from datetime import datetime
 import ollama
 from jawieVoice import JawieVoice
 from actions.tool_weather import get_weather_report
 from actions.search_internet import search_internet
-import re
+from sentenceStreamer import SentenceStreamer, clean_tts
+from chatContext import ChatContext
+from intentRouter import IntentRouter
+from telemetry import TRACER
+
+
+class Speculation:
+    # A reply requested for a transcript that is not final yet. Chunks are buffered, not spoken;
+    # when the turn is committed, chat() replays them and then follows the live stream.
+    def __init__(self, text, history):
+        self.text = text
+        self.history = history  # the context the request was built on
+        self.chunks = []
+        self.cond = threading.Condition()
+        self.done = False
+        self.error = None
+        self.cancel = threading.Event()
+
+    def run(self, client, **request):
+        stream = None
+        try:
+            stream = client.chat(**request)
+            for chunk in stream:
+                if self.cancel.is_set():
+                    break
+                with self.cond:
+                    self.chunks.append(chunk)
+                    self.cond.notify_all()
+        except Exception as e:
+            print(f"[AI] Speculative request failed: {e}")
+            self.error = e
+        finally:
+            if stream is not None:
+                stream.close()  # a discarded speculation stops Ollama generating too
+            with self.cond:
+                self.done = True
+                self.cond.notify_all()
+
+    def __iter__(self):
+        i = 0
+        while True:
+            with self.cond:
+                while i >= len(self.chunks) and not self.done:
+                    self.cond.wait()
+                if i >= len(self.chunks):
+                    if self.error:
+                        raise self.error
+                    return
+                chunk = self.chunks[i]
+            i += 1
+            yield chunk
+
+    def close(self):
+        self.cancel.set()
+
 
 class AIEngine:
-    def __init__(self, model="mistral"):
+    def __init__(self, model="mistral", stream=True, tts=None, max_context_tokens=3000, host=None, keep_alive=None,
+                 router=True, aliases=(), default_city=None):
         self.model = model
-        self.tts = JawieVoice()
+        self.client = ollama.Client(host=host)  # host=None uses OLLAMA_HOST or the local default
+        self.keep_alive = keep_alive  # how long Ollama keeps the model loaded after a request
+        self.stream = stream  # speak the reply sentence by sentence while it is generated
+        self.tts = tts or JawieVoice()
 
         self.system_prompt = """
             # Overview
@@ -42,7 +103,8 @@ class AIEngine:
 
         """
 
-        self.chat_history = [{"role": "system", "content": self.system_prompt}]
+        # History sent to the model, kept within a token budget by summarizing older turns
+        self.context = ChatContext(self.system_prompt, model, max_tokens=max_context_tokens, client=self.client)
 
         # Define tool schema (OpenAI style)
         self.tools = [{
@@ -95,42 +157,156 @@ class AIEngine:
             'search_internet': self.call_search_internet
         }
 
+        # Seconds a tool may take before the turn goes on without it
+        self.tool_timeouts = {
+            'get_weather': 6.0,
+            'get_date': 1.0,
+            'search_internet': 10.0
+        }
+
+        # Said while slow tools run; only the first one of a turn is spoken
+        self.tool_announcements = {
+            'get_weather': "Let me check the weather...",
+            'search_internet': "Give me a moment to fetch that information..."
+        }
+
+        self.tool_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="jowie-tool")
+
+        # Obvious date and weather questions are answered from a template without the model
+        self.router = IntentRouter(aliases, default_city) if router else None
+
+        # Reply started at a pause in the user's speech, before the endpoint was certain
+        self.speculation = None
+        self.speculation_lock = threading.Lock()
+
     def call_get_weather(self, city: str) -> str:
-        self.tts.speak("Let me check the weather...")
         return get_weather_report(city)
 
     def call_get_date(self) -> str:
         return datetime.now().strftime("%A, %B %d %Y")
 
     def call_search_internet(self, query: str) -> str:
-        self.tts.speak("Give me a moment to fetch that information...")
         return search_internet(query)
 
-    def ask(self, user_input: str):
-        self.chat_history.append({"role": "user", "content": user_input})
+    def ask(self, user_input: str, cancel=None, turn=None):
+        # Returns the reply that was spoken, or None when the turn was cancelled
+        # (setting the `cancel` event stops generation at the next token).
+        # `turn` is the trace ID the timings of this turn are recorded under.
+        cancel = cancel or threading.Event()
+        turn = turn if turn is not None else TRACER.current_turn
+        route = self.router.route(user_input) if self.router else None
+        if route:
+            self.discard_speculation()
+            reply = self.answer_directly(user_input, route, cancel, turn)
+            if reply or cancel.is_set():
+                return reply
+            print(f"[ROUTER] {route.tool} gave no usable result, asking the model")
+        else:
+            TRACER.count("router_misses", turn=turn)
+        speculation = self.take_speculation(user_input)
+        # Rolled back if the turn is cancelled, so the next turn does not start after an unanswered question
+        user_message = {"role": "user", "content": user_input}
+        self.context.append(user_message)
 
         print("Jowie:", end=" ", flush=True)
 
         # Step 1: Get initial reply (and possible tool_call)
-        response = ollama.chat(
-            model=self.model,
-            messages=self.chat_history,
-            tools=self.tools,
-            #think=False,
-        )
-
-        assistant_msg = response['message']['content']
-        tool_calls = response['message'].get('tool_calls') or []
-        print("[DEBUG] response:", response)
+        assistant_msg, tool_calls = self.chat(tools=self.tools, cancel=cancel, turn=turn, source=speculation)
+        if cancel.is_set():
+            print("\n[AI] Turn cancelled")
+            self.context.rollback(user_message)
+            return None
 
         if assistant_msg:
-            print(assistant_msg)
-            assistant_tts = self.clean_tts(assistant_msg)
+            self.context.append({"role": "assistant", "content": assistant_msg})
+
+        # Step 2: Run all tool calls of this turn at the same time
+        results = self.run_tools(tool_calls, turn)
+        if not results:
+            return assistant_msg
+        if cancel.is_set():
+            print("[AI] Turn cancelled")
+            self.context.rollback(user_message)
+            return None
+
+        # Step 3: Feed results back into chat
+        for func_name, result in results:
+            self.context.append({
+                "role": "tool",
+                "name": func_name,
+                "content": f"[TOOL RESULT] {result}"
+            })
+
+        # Step 4: Let model answer the whole turn after the tool results
+        print("Jowie:", end=" ", flush=True)
+        final_reply, _ = self.chat(cancel=cancel, turn=turn)
+        if cancel.is_set():
+            print("\n[AI] Turn cancelled")
+            self.context.rollback(user_message)
+            return None
+        self.context.append({"role": "assistant", "content": final_reply})
+        return final_reply
+
+    def answer_directly(self, user_input, route, cancel, turn=None):
+        # Fast path: run the routed tool and speak a template, no model call at all
+        print(f"[ROUTER] {route.tool} {route.args}")
+        TRACER.count("router_hits", turn=turn)
+        results = self.run_tools([{'function': {'name': route.tool, 'arguments': route.args}}], turn, announce=False)
+        if cancel.is_set() or not results:
+            return None
+        reply = self.router.render(route, results[0][1])
+        if reply is None:
+            return None
+        print("Jowie:", reply)
+        self.tts.speak(reply, turn)
+        self.context.append({"role": "user", "content": user_input})
+        self.context.append({"role": "assistant", "content": reply})
+        return reply
+
+    def speculate(self, user_input):
+        # Starts the first model request for a transcript that may still change. Nothing is
+        # spoken until ask() is called with the same text; anything else discards it.
+        if not self.stream or (self.router and self.router.match(user_input)):
+            return None  # routed questions never reach the model
+        history = self.context.messages()
+        with self.speculation_lock:
+            current = self.speculation
+            if current and current.text == user_input and current.history == history:
+                return current
+            if current:
+                current.close()
+            speculation = self.speculation = Speculation(user_input, history)
+        request = dict(model=self.model, messages=history + [{"role": "user", "content": user_input}],
+                       tools=self.tools, stream=True, keep_alive=self.keep_alive)
+        threading.Thread(target=speculation.run, args=(self.client,), kwargs=request, daemon=True).start()
+        TRACER.count("llm_speculations")
+        return speculation
 
-            self.tts.speak(assistant_tts)
-            self.chat_history.append({"role": "assistant", "content": assistant_msg})
+    def discard_speculation(self):
+        with self.speculation_lock:
+            speculation, self.speculation = self.speculation, None
+        if speculation:
+            speculation.close()
+            TRACER.count("llm_speculations_discarded")
 
-        # Step 2: Handle any tool calls
+    def take_speculation(self, user_input):
+        # The running speculation if it was made for exactly this question on the current history
+        with self.speculation_lock:
+            speculation, self.speculation = self.speculation, None
+        if speculation is None:
+            return None
+        if (speculation.text == user_input and speculation.error is None
+                and speculation.history == self.context.messages()):
+            TRACER.count("llm_speculations_used")
+            return speculation
+        speculation.close()
+        TRACER.count("llm_speculations_discarded")
+        return None
+
+    def run_tools(self, tool_calls, turn=None, announce=True):
+        # Dispatches every call on the tool pool and waits for each one up to its own timeout.
+        # Returns (name, result) pairs in the order the model asked for them.
+        pending = []
         for call in tool_calls:
             func_name = call['function']['name']
             args = call['function']['arguments']
@@ -139,45 +315,101 @@ class AIEngine:
             if not tool_func:
                 print(f"[Error] Unknown function: {func_name}")
                 continue
+            pending.append((func_name, time.monotonic() + self.tool_timeouts.get(func_name, 10.0),
+                            self.tool_pool.submit(self.run_tool, func_name, tool_func, args, turn)))
 
-            result = tool_func(**args)
+        announcement = next((self.tool_announcements[name] for name, _, _ in pending
+                             if name in self.tool_announcements), None)
+        if announcement and announce:
+            self.tts.speak(announcement, turn)
 
-            # Step 3: Feed result back into chat
-            self.chat_history.append({
-                "role": "tool",
-                "name": func_name,
-                "content": f"[TOOL RESULT] {result}"
-            })
+        results = []
+        for func_name, deadline, future in pending:
+            try:
+                result = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except TimeoutError:
+                print(f"[Error] Tool {func_name} timed out")
+                result = f"{func_name} did not answer in time."
+            except Exception as e:
+                print(f"[Error] Tool {func_name} failed: {e}")
+                result = f"{func_name} failed: {e}"
+            results.append((func_name, result))
+        return results
+
+    def run_tool(self, func_name, tool_func, args, turn=None):
+        with TRACER.span(f"tool_{func_name}", turn):
+            return tool_func(**args)
 
-            # Step 4: Let model respond after tool result
-            followup = ollama.chat(
+    def chat(self, tools=None, cancel=None, turn=None, source=None):
+        # Runs one model turn over the current history and speaks the reply.
+        # Returns the raw reply text and any tool calls the model made.
+        # `source` is a Speculation already streaming this request.
+        TRACER.event("llm_request", turn, once=True)
+        started = time.monotonic()
+        if not self.stream:
+            response = self.client.chat(
                 model=self.model,
-                messages=self.chat_history
+                messages=self.context.messages(),
+                tools=tools,
+                keep_alive=self.keep_alive,
+                #think=False,
             )
+            print("[DEBUG] response:", response)
+            self.trace_ollama(response, started, turn)
+            reply = response['message']['content']
+            if reply:
+                print(reply)
+                self.tts.speak(self.clean_tts(reply), turn)
+            return reply, response['message'].get('tool_calls') or []
 
-            final_reply = followup['message']['content']
-            tts_reply = self.clean_tts(final_reply)
-            print("Jowie:", final_reply)
-            self.tts.speak(tts_reply)
-            self.chat_history.append({"role": "assistant", "content": final_reply})
+        streamer = SentenceStreamer(lambda sentence: self.tts.speak(sentence, turn))
+        parts = []
+        tool_calls = []
+        stream = source or self.client.chat(model=self.model, messages=self.context.messages(), tools=tools,
+                                            stream=True, keep_alive=self.keep_alive)
+        try:
+            for chunk in stream:
+                if cancel and cancel.is_set():
+                    return "".join(parts), []
+                message = chunk['message']
+                tool_calls.extend(message.get('tool_calls') or [])
+                token = message.get('content') or ""
+                if token:
+                    if not parts:
+                        TRACER.event("llm_first_token", turn, once=True)
+                        TRACER.observe("llm_first_token_seconds", time.monotonic() - started, turn)
+                    print(token, end="", flush=True)
+                    parts.append(token)
+                    streamer.feed(token)
+                if chunk.get('done'):
+                    print("\n[DEBUG] response:", chunk)
+                    self.trace_ollama(chunk, started, turn)
+        finally:
+            stream.close()  # drops the HTTP stream, so Ollama stops generating as well
+        streamer.flush()
+        return "".join(parts), tool_calls
+
+    def trace_ollama(self, response, started, turn):
+        # Ollama reports its own token counts and durations (in nanoseconds) on the last chunk
+        TRACER.event("llm_done", turn)
+        TRACER.observe("llm_seconds", time.monotonic() - started, turn)
+        for field in ("load_duration", "prompt_eval_duration", "eval_duration"):
+            if response.get(field):
+                TRACER.observe(f"ollama_{field.replace('_duration', '')}_seconds", response[field] / 1e9, turn)
+        for field in ("prompt_eval_count", "eval_count"):
+            if response.get(field):
+                TRACER.count(f"ollama_{field.replace('_count', '')}_tokens", response[field], turn)
 
     def clean_tts(self, text):
-        # remove all thinking content
-        text = re.sub(r"<think>.*?</think>", "", text, flags=re.DOTALL)
-        # Remove emojis using a regex pattern
-        emoji_pattern = re.compile(
-            "[\U0001F600-\U0001F64F"  # Emoticons
-            "\U0001F300-\U0001F5FF"  # Symbols & Pictographs
-            "\U0001F680-\U0001F6FF"  # Transport & Map Symbols
-            "\U0001F1E0-\U0001F1FF"  # Flags
-            "\U00002700-\U000027BF"  # Dingbats
-            "\U000024C2-\U0001F251"  # Enclosed Characters
-            "]+", flags=re.UNICODE)
-        text = emoji_pattern.sub("", text)
-        return text
+        return clean_tts(text)
+
+    @property
+    def chat_history(self):
+        return self.context.messages()
 
     def reset(self):
-        self.chat_history = [{"role": "system", "content": self.system_prompt}]
+        self.discard_speculation()
+        self.context.reset()
 
 
 if __name__ == "__main__":
@@ -197,5 +429,6 @@ if __name__ == "__main__":
         user_input = input("You: ")
         if user_input.lower() in {"exit", "quit"}:
             print("Jowie: Goodbye!")
+            print(f"[ROUTER] {ai.router.stats()}")
             break
-        ai.ask(user_input)
+        ai.ask(user_input, turn=TRACER.new_turn())
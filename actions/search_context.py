@@ -0,0 +1,200 @@
+import json
+import math
+import re
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+# Turns raw search hits into a short context for the model: results are split into passages,
+# ranked against the query with BM25, near-duplicates are dropped and only what fits in a
+# token budget is returned. Passages are kept in a local index on disk, so a later question
+# about something already fetched is answered without searching again.
+
+INDEX_FILE = Path("cache/search_index.json")
+
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "but", "of", "in", "on", "at", "to", "for", "from", "by", "with", "about",
+    "is", "are", "was", "were", "be", "been", "it", "its", "this", "that", "these", "those", "as", "into",
+    "what", "who", "whom", "which", "when", "where", "why", "how", "do", "does", "did", "has", "have", "had",
+    "i", "you", "he", "she", "we", "they", "me", "my", "your", "our", "their", "can", "could", "would",
+    "will", "should", "please", "tell", "know", "there", "than", "then", "so", "if", "not", "no",
+}
+
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(])")
+
+
+def tokenize(text):
+    return [word for word in re.findall(r"[a-z0-9]+", text.lower()) if word not in STOPWORDS]
+
+
+def count_tokens(text):
+    return len(text) // 4 + 1  # same rough estimate as chatContext
+
+
+def split_passages(results, max_words=60):
+    # One passage per group of whole sentences of at most `max_words` words
+    passages = []
+    for result in results:
+        body = " ".join(str(result.get("body", "")).split())
+        sentences = SENTENCE_SPLIT.split(body) if body else []
+        current = []
+        for sentence in sentences:
+            if current and len(" ".join(current + [sentence]).split()) > max_words:
+                passages.append((" ".join(current), result))
+                current = []
+            current.append(sentence)
+        if current:
+            passages.append((" ".join(current), result))
+    return [{"text": text, "title": result.get("title", ""), "href": result.get("href", "")}
+            for text, result in passages]
+
+
+class SearchIndex:
+    # BM25 over every passage fetched so far, oldest dropped first beyond `max_passages`
+    def __init__(self, path=None, max_passages=2000, max_age=86400.0, k1=1.5, b=0.75):
+        self.path = Path(path) if path else None
+        self.max_passages = max_passages
+        self.max_age = max_age  # seconds a passage may answer a question without a new search
+        self.k1 = k1
+        self.b = b
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()  # one writer of the temp file at a time
+        self.passages = []  # {"text", "title", "href", "fetched"}
+        self.terms = []     # Counter of tokens per passage
+        self.df = Counter()
+        self.total_length = 0
+        self.seen = {}      # normalized passage text -> passage, for exact duplicates
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    def add(self, passages, fetched=None):
+        fetched = fetched or time.time()
+        added = refreshed = 0
+        with self.lock:
+            for passage in passages:
+                key = " ".join(tokenize(passage["text"]))
+                if not key:
+                    continue
+                if key in self.seen:
+                    self.seen[key]["fetched"] = fetched  # fetched again, so it is current
+                    refreshed += 1
+                    continue
+                self._append(dict(passage, fetched=fetched), key)
+                added += 1
+            overflow = len(self.passages) - self.max_passages
+            if overflow > 0:
+                self._rebuild(self.passages[overflow:])
+        if added or refreshed:
+            self.save()
+        return added
+
+    def _append(self, passage, key=None):
+        terms = Counter(tokenize(passage["text"] + " " + passage.get("title", "")))
+        self.passages.append(passage)
+        self.terms.append(terms)
+        self.df.update(terms.keys())
+        self.total_length += sum(terms.values())
+        self.seen[key or " ".join(tokenize(passage["text"]))] = passage
+
+    def _rebuild(self, passages):
+        self.passages, self.terms, self.df, self.total_length, self.seen = [], [], Counter(), 0, {}
+        for passage in passages:
+            self._append(passage)
+
+    def search(self, query, limit=8, max_age=None, since=None):
+        # (score, passage) pairs, best first; max_age skips passages fetched longer ago and
+        # since skips those fetched before that time (only the results of one search)
+        words = set(tokenize(query))
+        with self.lock:
+            if not words or not self.passages:
+                return []
+            n = len(self.passages)
+            average = self.total_length / n
+            oldest = max(time.time() - max_age if max_age else 0, since or 0)
+            scored = []
+            for passage, terms in zip(self.passages, self.terms):
+                if passage["fetched"] < oldest:
+                    continue
+                length = sum(terms.values())
+                score = 0.0
+                for word in words:
+                    tf = terms.get(word)
+                    if not tf:
+                        continue
+                    idf = math.log(1 + (n - self.df[word] + 0.5) / (self.df[word] + 0.5))
+                    score += idf * tf * (self.k1 + 1) / (tf + self.k1 * (1 - self.b + self.b * length / average))
+                if score > 0:
+                    scored.append((score, passage))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return scored[:limit]
+
+    def context(self, query, budget=250, max_age=None, min_coverage=0.0, since=None):
+        # The best passages that fit in `budget` tokens, one per line with their source.
+        # Returns None when the ranked passages cover less than `min_coverage` of the query terms.
+        words = set(tokenize(query))
+        ranked = self.search(query, limit=16, max_age=max_age, since=since)
+        chosen, covered, used, sentences = [], set(), 0, set()
+        for _, passage in ranked:
+            terms = set(tokenize(passage["text"]))
+            # Near-duplicate of a passage already chosen (same story on another site)
+            if any(len(terms & other) / max(1, len(terms | other)) > 0.6 for other, _ in chosen):
+                continue
+            # Sentences another site already contributed are left out
+            fresh = [s for s in SENTENCE_SPLIT.split(passage["text"]) if " ".join(tokenize(s)) not in sentences]
+            if not fresh:
+                continue
+            line = f"- {' '.join(fresh)} ({passage['title'] or passage['href']})"
+            cost = count_tokens(line)
+            if used + cost > budget:
+                continue
+            chosen.append((terms, line))
+            sentences.update(" ".join(tokenize(s)) for s in fresh)
+            covered |= terms & words
+            used += cost
+        if not chosen or (words and len(covered) / len(words) < min_coverage):
+            return None
+        return "\n".join(line for _, line in chosen)
+
+    def answer_locally(self, query, budget=250, min_coverage=0.8):
+        # Context from passages fetched within max_age, if they cover the question well enough
+        context = self.context(query, budget, max_age=self.max_age, min_coverage=min_coverage)
+        with self.lock:
+            if context:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return context
+
+    def stats(self):
+        with self.lock:
+            return {"passages": len(self.passages), "local_hits": self.hits, "local_misses": self.misses}
+
+    def load(self):
+        if not self.path or not self.path.exists():
+            return
+        try:
+            stored = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            print(f"[SEARCH] Could not read {self.path}: {e}")
+            return
+        with self.lock:
+            self._rebuild(stored[-self.max_passages:])
+
+    def save(self):
+        if not self.path:
+            return
+        with self.save_lock:
+            with self.lock:
+                snapshot = list(self.passages)
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.path.with_suffix(".tmp")
+                tmp.write_text(json.dumps(snapshot), encoding="utf-8")
+                tmp.replace(self.path)
+            except OSError as e:
+                print(f"[SEARCH] Could not write {self.path}: {e}")
+
+
+SEARCH_INDEX = SearchIndex(path=INDEX_FILE)
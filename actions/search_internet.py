@@ -1,13 +1,31 @@
+import time
 from duckduckgo_search import DDGS
+from actions.tool_cache import TOOL_CACHE, normalize_query
+from actions.search_context import SEARCH_INDEX, split_passages
 
+CONTEXT_TOKENS = 250  # budget for the passages handed to the model
+
+@TOOL_CACHE.cached("search", ttl=3600, key=normalize_query,
+                   cache_if=lambda result: not result.startswith(("Search failed", "No results")))
 def search_internet(query: str) -> str:
+    # Passages fetched for earlier questions answer this one if they cover it well enough
+    local = SEARCH_INDEX.answer_locally(query, CONTEXT_TOKENS)
+    if local:
+        print(f"[SEARCH] Answered from the local index: {query}")
+        return local
+
     print(f"[SEARCH] Searching for: {query}")
     try:
         with DDGS() as ddgs:
-            results = ddgs.text(query, max_results=3)
+            results = ddgs.text(query, max_results=5)
             print(f"[SEARCH] result title: {results[0]['title'] if results else 'No results found'}, total searches: {len(results) if results else 0}")
             if not results:
                 return "No results found."
-            return "\n\n".join([f"{r['title']}\n{r['body']}\n{r['href']}" for r in results])
     except Exception as e:
         return f"Search failed: {str(e)}"
+
+    # Only the best ranked, deduplicated passages of this search go into the prompt, not the raw
+    # results; older passages in the index could outrank them with facts that are out of date
+    fetched = time.time()
+    SEARCH_INDEX.add(split_passages(results), fetched)
+    return SEARCH_INDEX.context(query, CONTEXT_TOKENS, since=fetched) or "No results found."
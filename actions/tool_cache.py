@@ -0,0 +1,135 @@
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from pathlib import Path
+
+CACHE_FILE = Path("cache/tool_cache.json")
+
+# Different spellings of the same place share one cache entry
+CITY_ALIASES = {
+    "brussel": "brussels",
+    "bruxelles": "brussels",
+    "antwerpen": "antwerp",
+    "anvers": "antwerp",
+    "gent": "ghent",
+    "gand": "ghent",
+    "luik": "liege",
+    "liège": "liege",
+    "leuven": "louvain",
+    "nyc": "new york",
+    "new york city": "new york",
+    "la": "los angeles",
+}
+
+FILLER_WORDS = {"please", "hey", "can", "you", "could", "tell", "me"}
+
+
+def normalize_text(text):
+    text = re.sub(r"[^\w\s]", " ", str(text).lower())
+    return " ".join(text.split())
+
+
+def normalize_city(city="brussels"):
+    city = normalize_text(city)
+    return CITY_ALIASES.get(city, city)
+
+
+def normalize_query(query):
+    return " ".join(word for word in normalize_text(query).split() if word not in FILLER_WORDS)
+
+
+class ToolCache:
+    # Tool results keyed by (tool, normalized arguments), each with its own expiry time.
+    # Least recently used entries are evicted once `max_entries` is reached.
+    def __init__(self, max_entries=256, path=None):
+        self.max_entries = max_entries
+        self.path = Path(path) if path else None
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()  # one writer of the temp file at a time
+        self.entries = OrderedDict()  # "tool|key" -> (expires_at, value), expiry in wall-clock time
+        self.hits = {}
+        self.misses = {}
+        self.load()
+
+    def get(self, tool, key):
+        with self.lock:
+            entry = self.entries.get(f"{tool}|{key}")
+            if entry and entry[0] > time.time():
+                self.entries.move_to_end(f"{tool}|{key}")
+                self.hits[tool] = self.hits.get(tool, 0) + 1
+                return True, entry[1]
+            if entry:
+                del self.entries[f"{tool}|{key}"]
+            self.misses[tool] = self.misses.get(tool, 0) + 1
+            return False, None
+
+    def put(self, tool, key, value, ttl):
+        with self.lock:
+            self.entries[f"{tool}|{key}"] = (time.time() + ttl, value)
+            self.entries.move_to_end(f"{tool}|{key}")
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        self.save()
+
+    def cached(self, tool, ttl, key, cache_if=lambda result: True):
+        # Decorator: `key` takes the tool's arguments and returns its normalized cache key
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                cache_key = key(*args, **kwargs)
+                hit, value = self.get(tool, cache_key)
+                if hit:
+                    print(f"[CACHE] {tool} hit for {cache_key!r}")
+                    return value
+                value = func(*args, **kwargs)
+                if cache_if(value):
+                    self.put(tool, cache_key, value, ttl)
+                return value
+            return wrapper
+        return decorator
+
+    def stats(self):
+        with self.lock:
+            tools = set(self.hits) | set(self.misses)
+            return {tool: {"hits": self.hits.get(tool, 0),
+                           "misses": self.misses.get(tool, 0),
+                           "entries": sum(1 for k in self.entries if k.startswith(f"{tool}|"))}
+                    for tool in sorted(tools)}
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+        self.save()
+
+    def load(self):
+        if not self.path or not self.path.exists():
+            return
+        try:
+            stored = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            print(f"[CACHE] Could not read {self.path}: {e}")
+            return
+        now = time.time()
+        for cache_key, (expires_at, value) in stored.items():
+            if expires_at > now:
+                self.entries[cache_key] = (expires_at, value)
+
+    def save(self):
+        if not self.path:
+            return
+        with self.save_lock:
+            with self.lock:
+                snapshot = dict(self.entries)
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.path.with_suffix(".tmp")
+                tmp.write_text(json.dumps(snapshot), encoding="utf-8")
+                tmp.replace(self.path)
+            except OSError as e:
+                print(f"[CACHE] Could not write {self.path}: {e}")
+
+
+TOOL_CACHE = ToolCache(path=CACHE_FILE)
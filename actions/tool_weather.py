@@ -1,9 +1,12 @@
-import requests
+from httpClient import get_client
+from actions.tool_cache import TOOL_CACHE, normalize_city
 
+@TOOL_CACHE.cached("weather", ttl=600, key=normalize_city,
+                   cache_if=lambda result: result.startswith("The weather in"))
 def get_weather_report(city="brussels"):
     try:
         url = f"http://wttr.in/{city}?format=%C+%t+%w"
-        response = requests.get(url, timeout=5)
+        response = get_client().get(url, timeout=5)
         if response.status_code == 200:
             print(f"[WEATHER] Fetched weather for {city}: {response.text.strip()}")
             return f"The weather in {city} is: {response.text.strip()}."
@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+CACHE_DIR = Path("cache/tts")
+
+
+class AudioCache:
+    # Content-addressed store of synthesized PCM, one file per (text, voice, speed, lang_code).
+    # Pinned entries (the warm-up phrases) are never evicted; everything else is dropped
+    # least recently used first once the store grows past `max_bytes`.
+    def __init__(self, directory=CACHE_DIR, max_bytes=64 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # key -> size in bytes, least recently used first
+        self.pinned = set()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    @staticmethod
+    def key(text, voice, speed, lang_code):
+        raw = json.dumps([text, voice, speed, lang_code], ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def path(self, key):
+        return self.directory / f"{key}.pcm"
+
+    def get(self, key):
+        with self.lock:
+            if key not in self.entries:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+        try:
+            pcm = self.path(key).read_bytes()
+            os.utime(self.path(key))  # keeps the LRU order across restarts
+            return pcm
+        except OSError:
+            with self.lock:
+                self.size -= self.entries.pop(key, 0)
+            return None
+
+    def put(self, key, pcm, pinned=False):
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp = self.path(key).with_suffix(".tmp")
+            tmp.write_bytes(pcm)
+            tmp.replace(self.path(key))
+        except OSError as e:
+            print(f"[TTS Cache] Could not store audio: {e}")
+            return
+        with self.lock:
+            self.size += len(pcm) - self.entries.get(key, 0)
+            self.entries[key] = len(pcm)
+            self.entries.move_to_end(key)
+            if pinned:
+                self.pinned.add(key)
+            self._evict()
+
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.entries
+
+    def pin(self, key):
+        with self.lock:
+            self.pinned.add(key)
+
+    def _evict(self):
+        for key in list(self.entries):
+            if self.size <= self.max_bytes:
+                return
+            if key in self.pinned:
+                continue
+            self.size -= self.entries.pop(key)
+            try:
+                os.remove(self.path(key))
+            except OSError:
+                pass
+
+    def load(self):
+        # Rebuild the index from disk, oldest files first so they are evicted first
+        if not self.directory.exists():
+            return
+        files = sorted(self.directory.glob("*.pcm"), key=lambda p: p.stat().st_mtime)
+        for file in files:
+            size = file.stat().st_size
+            self.entries[file.stem] = size
+            self.size += size
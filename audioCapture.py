@@ -0,0 +1,87 @@
+import time
+import sounddevice as sd
+from ringBuffer import SampleQueue
+from telemetry import TRACER
+
+# Microphone capture decoupled from everything downstream. The PortAudio callback only copies
+# the block into a lock-free SampleQueue, so a long Whisper decode or LLM turn never stops
+# the device from being read; consumers take fixed-size chunks at their own pace. Audio is
+# only lost if a consumer falls more than `buffer_seconds` behind, and then it is counted.
+
+
+class AudioCapture:
+    def __init__(self, fs=16000, device=None, block_size=512, buffer_seconds=30.0):
+        self.fs = fs
+        self.device = device
+        self.block_size = block_size  # 32 ms at 16 kHz, the callback's share of capture latency
+        self.queue = SampleQueue(int(fs * buffer_seconds))
+        self.stream = None
+        # Written by the callback only
+        self.overflows = 0   # the device had samples we did not collect in time
+        self.underflows = 0  # PortAudio delivered a block with gaps
+        self.callbacks = 0
+        self.reported = {}
+
+    def _callback(self, indata, frames, time_info, status):
+        self.callbacks += 1
+        if status.input_overflow:
+            self.overflows += 1
+        if status.input_underflow:
+            self.underflows += 1
+        self.queue.push(indata[:, 0])  # copies into the ring, no allocation
+
+    def start(self):
+        self.stream = sd.InputStream(samplerate=self.fs, channels=1, dtype='float32', device=self.device,
+                                     blocksize=self.block_size, callback=self._callback)
+        self.stream.start()
+        return self
+
+    def stop(self):
+        if self.stream:
+            self.stream.stop()
+            self.stream.close()
+            self.stream = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def available(self):
+        return self.queue.available()
+
+    def backlog_seconds(self):
+        # How far the consumer is behind the microphone
+        return self.queue.available() / self.fs
+
+    def read_nowait(self, n):
+        # Exactly n samples, or None when they have not all arrived yet
+        if self.queue.available() < n:
+            return None
+        self.report()
+        return self.queue.pop(n)
+
+    def read(self, n):
+        # Blocks until n samples are there, polling at half a callback block
+        while self.queue.available() < n:
+            time.sleep(self.block_size / self.fs / 2)
+        return self.read_nowait(n)
+
+    def stats(self):
+        return {
+            "overflows": self.overflows,
+            "underflows": self.underflows,
+            "dropped_samples": self.queue.dropped,
+            "backlog_seconds": round(self.backlog_seconds(), 3),
+        }
+
+    def report(self):
+        # Runs on the consumer side, so the tracer lock is never taken inside the callback
+        for name, value in (("overflows", self.overflows), ("underflows", self.underflows),
+                            ("dropped_samples", self.queue.dropped)):
+            delta = value - self.reported.get(name, 0)
+            if delta:
+                self.reported[name] = value
+                TRACER.count(f"capture_{name}", delta)
+                print(f"[CAPTURE] {name.replace('_', ' ').capitalize()}: {value}")
@@ -0,0 +1,152 @@
+import numpy as np
+
+# Block-by-block DSP front end shared by the listener and the noise monitor:
+# streaming spectral-gating noise suppression with a noise floor that keeps adapting,
+# followed by smoothed automatic gain control. State and work buffers are allocated once and
+# updated in place, so any block size can be pushed through at a constant cost per sample;
+# only the two FFT results are new arrays per frame (numpy's FFT has no output buffer).
+
+
+class SpectralGate:
+    # STFT with a sqrt-Hann window at 50% overlap (perfect reconstruction), adds `frame_size`
+    # samples of latency (32 ms at 16 kHz)
+    def __init__(self, fs=16000, frame_size=512, noise_rise=0.01, noise_fall=0.05, over_subtraction=2.0,
+                 floor_db=-18.0, gain_smoothing=0.6):
+        self.fs = fs
+        self.frame_size = frame_size
+        self.hop = frame_size // 2
+        self.window = np.sqrt(np.hanning(frame_size + 1)[:-1]).astype(np.float32)
+        bins = frame_size // 2 + 1
+        self.inbuf = np.zeros(frame_size, dtype=np.float32)   # last frame_size input samples
+        self.outbuf = np.zeros(frame_size, dtype=np.float32)  # overlap-add accumulator
+        self.frame = np.zeros(frame_size, dtype=np.float32)
+        self.power = np.zeros(bins, dtype=np.float32)
+        self.scratch = np.zeros(bins, dtype=np.float32)
+        self.falling = np.zeros(bins, dtype=bool)
+        self.rising = np.zeros(bins, dtype=bool)
+        self.noise = np.zeros(bins, dtype=np.float32)
+        self.gain = np.ones(bins, dtype=np.float32)
+        self.target = np.ones(bins, dtype=np.float32)
+        self.filled = 0
+        self.frames_seen = 0
+        # The noise floor drops towards quiet bins and creeps up during louder ones, so it tracks a
+        # changing room without swallowing speech
+        self.noise_rise = noise_rise
+        self.noise_fall = noise_fall
+        self.over_subtraction = over_subtraction
+        self.floor = 10 ** (floor_db / 20)
+        self.gain_smoothing = gain_smoothing
+
+    def process(self, block):
+        out = np.empty(len(block), dtype=np.float32)
+        i = 0
+        start = self.frame_size - self.hop
+        while i < len(block):
+            take = min(self.hop - self.filled, len(block) - i)
+            self.inbuf[start + self.filled:start + self.filled + take] = block[i:i + take]
+            out[i:i + take] = self.outbuf[self.filled:self.filled + take]
+            self.filled += take
+            i += take
+            if self.filled == self.hop:
+                self._process_frame()
+                self.filled = 0
+        return out
+
+    def _process_frame(self):
+        np.multiply(self.inbuf, self.window, out=self.frame)
+        spectrum = np.fft.rfft(self.frame)
+        np.multiply(spectrum.real, spectrum.real, out=self.power)
+        np.multiply(spectrum.imag, spectrum.imag, out=self.scratch)
+        self.power += self.scratch
+
+        if self.frames_seen == 0:
+            self.noise[:] = self.power
+        else:
+            np.less(self.power, self.noise, out=self.falling)
+            np.logical_not(self.falling, out=self.rising)
+            np.subtract(self.power, self.noise, out=self.scratch)
+            self.scratch *= self.noise_fall
+            np.add(self.noise, self.scratch, out=self.noise, where=self.falling)
+            np.multiply(self.noise, 1 + self.noise_rise, out=self.noise, where=self.rising)
+        self.frames_seen += 1
+
+        # Spectral subtraction gain with a floor (limits musical noise), smoothed over time
+        np.add(self.power, 1e-12, out=self.scratch)
+        np.divide(self.noise, self.scratch, out=self.target)
+        np.multiply(self.target, -self.over_subtraction, out=self.target)
+        self.target += 1
+        np.maximum(self.target, self.floor, out=self.target)
+        self.gain *= self.gain_smoothing
+        self.gain += (1 - self.gain_smoothing) * self.target
+
+        spectrum *= self.gain
+        np.multiply(np.fft.irfft(spectrum, n=self.frame_size), self.window, out=self.frame)
+
+        self.outbuf[:-self.hop] = self.outbuf[self.hop:]
+        self.outbuf[-self.hop:] = 0
+        self.outbuf += self.frame
+        self.inbuf[:-self.hop] = self.inbuf[self.hop:]
+
+    def reset(self):
+        for buffer in (self.inbuf, self.outbuf, self.noise):
+            buffer[:] = 0
+        self.gain[:] = 1
+        self.filled = 0
+        self.frames_seen = 0
+
+
+class AutoGain:
+    # Pulls the block level towards `target_db`; turns down quickly (attack) and up slowly
+    # (release), ramps between blocks, and holds the gain during silence so the noise floor
+    # is not pumped up. Callers with a VAD decision pass it as `speech` instead of the level gate
+    def __init__(self, fs=16000, target_db=-30.0, max_gain_db=30.0, min_gain_db=-10.0, gate_db=-60.0,
+                 attack_time=0.05, release_time=1.0):
+        self.fs = fs
+        self.target_db = target_db
+        self.max_gain_db = max_gain_db
+        self.min_gain_db = min_gain_db
+        self.gate_db = gate_db
+        self.attack_time = attack_time  # time constants in seconds, so any block size behaves the same
+        self.release_time = release_time
+        self.gain_db = 0.0
+
+    def process(self, block, speech=None):
+        rms = np.sqrt(np.mean(np.square(block))) if len(block) else 0.0
+        level_db = 20 * np.log10(rms) if rms > 0 else -np.inf
+        previous = 10 ** (self.gain_db / 20)
+
+        if speech is None:
+            speech = level_db > self.gate_db
+        if speech and level_db > -np.inf:
+            wanted = np.clip(self.target_db - level_db, self.min_gain_db, self.max_gain_db)
+            tau = self.attack_time if wanted < self.gain_db else self.release_time
+            self.gain_db += (1 - np.exp(-len(block) / self.fs / tau)) * (wanted - self.gain_db)
+
+        current = 10 ** (self.gain_db / 20)
+        out = block * np.linspace(previous, current, len(block), dtype=np.float32)
+        return np.clip(out, -1.0, 1.0, out=out)
+
+    def reset(self):
+        self.gain_db = 0.0
+
+
+class AudioFrontend:
+    def __init__(self, fs=16000, noise_suppression=True, agc=True, target_db=-30.0):
+        self.gate = SpectralGate(fs) if noise_suppression else None
+        self.agc = AutoGain(fs, target_db=target_db) if agc else None
+
+    def suppress_noise(self, block):
+        block = np.asarray(block, dtype=np.float32).reshape(-1)
+        return self.gate.process(block) if self.gate else block
+
+    def normalize(self, block, speech=None):
+        return self.agc.process(block, speech) if self.agc else block
+
+    def process(self, block, speech=None):
+        return self.normalize(self.suppress_noise(block), speech)
+
+    def reset(self):
+        if self.gate:
+            self.gate.reset()
+        if self.agc:
+            self.agc.reset()
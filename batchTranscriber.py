@@ -0,0 +1,172 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+import numpy as np
+
+# Bulk transcription of recorded meetings and voice notes. Files are decoded and resampled to
+# 16 kHz in blocks (so an hour-long recording never sits in memory at once), each block is
+# split by VAD and decoded in batches, and files are spread over a pool of worker processes.
+# Results are appended to a JSONL file, one line per file; files already in it are skipped,
+# so an interrupted job picks up where it stopped.
+
+AUDIO_EXTENSIONS = {".wav", ".mp3", ".m4a", ".flac", ".ogg", ".opus", ".webm", ".mp4", ".aac", ".wma"}
+SAMPLE_RATE = 16000
+
+_worker = {}  # per-process model state, filled by init_worker
+
+
+def find_audio(inputs):
+    files = []
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            files.extend(sorted(p for p in path.rglob("*") if p.suffix.lower() in AUDIO_EXTENSIONS))
+        elif path.exists():
+            files.append(path)
+        else:
+            print(f"[BATCH] Not found: {path}")
+    return files
+
+
+def completed_files(output):
+    done = set()
+    if not Path(output).exists():
+        return done
+    with open(output, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # a line cut off by an interrupted run
+            if "error" not in record:
+                done.add(record["path"])
+    return done
+
+
+def stream_audio(path, block_seconds=600.0, search_seconds=5.0):
+    # Decodes and resamples to 16 kHz mono with PyAV, yielding (offset_seconds, float32 block).
+    # Blocks are cut at the quietest 30 ms frame near the limit so a word is rarely split.
+    import av
+
+    block = int(block_seconds * SAMPLE_RATE)
+    search = int(search_seconds * SAMPLE_RATE)
+    frame = int(0.03 * SAMPLE_RATE)
+    resampler = av.audio.resampler.AudioResampler(format="s16", layout="mono", rate=SAMPLE_RATE)
+    pending = []
+    pending_len = 0
+    offset = 0
+
+    def resampled(container):
+        for audio_frame in container.decode(audio=0):
+            yield from resampler.resample(audio_frame)
+        yield from resampler.resample(None)  # flush
+
+    with av.open(str(path), mode="r", metadata_errors="ignore") as container:
+        for out in resampled(container):
+            samples = out.to_ndarray().reshape(-1)
+            pending.append(samples)
+            pending_len += len(samples)
+            while pending_len >= block + search:
+                audio = np.concatenate(pending)
+                tail = audio[block - search:block + search][:(2 * search) // frame * frame]
+                energy = np.mean(tail.reshape(-1, frame).astype(np.float32) ** 2, axis=1)
+                cut = block - search + int(np.argmin(energy)) * frame
+                yield offset / SAMPLE_RATE, audio[:cut].astype(np.float32) / 32768.0
+                offset += cut
+                pending = [audio[cut:]]
+                pending_len = len(pending[0])
+
+    if pending_len:
+        yield offset / SAMPLE_RATE, np.concatenate(pending).astype(np.float32) / 32768.0
+
+
+def init_worker(model_size, compute_type, device, cpu_threads, model_path):
+    from whisperRegistry import REGISTRY
+    model = REGISTRY.get(model_size, compute_type, device, model_path, cpu_threads=cpu_threads)
+    try:
+        from faster_whisper import BatchedInferencePipeline
+        _worker["pipeline"] = BatchedInferencePipeline(model=model)
+    except ImportError:
+        _worker["pipeline"] = None  # faster-whisper < 1.1: plain VAD-filtered decoding
+    _worker["model"] = model
+
+
+def transcribe_file(path, batch_size, language):
+    started = time.perf_counter()
+    segments_out = []
+    duration = 0.0
+    detected = language
+    try:
+        for offset, audio in stream_audio(path):
+            duration = offset + len(audio) / SAMPLE_RATE
+            if _worker["pipeline"] is not None:
+                segments, info = _worker["pipeline"].transcribe(audio, batch_size=batch_size, language=language)
+            else:
+                segments, info = _worker["model"].transcribe(audio, vad_filter=True, language=language)
+            for seg in segments:
+                segments_out.append({"start": round(offset + seg.start, 2), "end": round(offset + seg.end, 2),
+                                     "text": seg.text.strip()})
+            detected = detected or info.language
+    except Exception as e:
+        return {"path": str(path), "error": str(e)}
+    return {
+        "path": str(path),
+        "duration": round(duration, 2),
+        "language": detected,
+        "elapsed": round(time.perf_counter() - started, 2),
+        "text": " ".join(seg["text"] for seg in segments_out),
+        "segments": segments_out,
+    }
+
+
+def transcribe_batch(inputs, output, model_size="large-v3", compute_type="int8", device="auto", workers=None,
+                     batch_size=8, language=None, model_path="models/"):
+    files = find_audio(inputs)
+    done = completed_files(output)
+    todo = [f for f in files if str(f) not in done]
+    print(f"[BATCH] {len(files)} files, {len(files) - len(todo)} already done, {len(todo)} to go")
+    if not todo:
+        return 0
+
+    workers = workers or max(1, min(len(todo), (os.cpu_count() or 2) // 2))
+    cpu_threads = max(1, (os.cpu_count() or 1) // workers)
+    audio_seconds = 0.0
+    started = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(model_size, compute_type, device, cpu_threads, model_path)) as pool, \
+            open(output, "a", encoding="utf-8") as out:
+        futures = {pool.submit(transcribe_file, path, batch_size, language): path for path in todo}
+        for i, future in enumerate(as_completed(futures), 1):
+            record = future.result()
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            if "error" in record:
+                print(f"[BATCH] {i}/{len(todo)} failed {record['path']}: {record['error']}")
+            else:
+                audio_seconds += record["duration"]
+                print(f"[BATCH] {i}/{len(todo)} {record['path']} ({record['duration']:.0f}s audio in {record['elapsed']:.0f}s)")
+
+    elapsed = time.perf_counter() - started
+    print(f"[BATCH] {audio_seconds / 60:.1f} min of audio in {elapsed / 60:.1f} min "
+          f"({audio_seconds / elapsed:.1f}x real time, {workers} workers)")
+    return len(todo)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Transcribe audio files in bulk to JSONL")
+    parser.add_argument("inputs", nargs="+", help="audio files and/or directories")
+    parser.add_argument("-o", "--output", default="transcripts.jsonl")
+    parser.add_argument("--model", default="large-v3")
+    parser.add_argument("--compute-type", default="int8")
+    parser.add_argument("--device", default="auto")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--language", default=None)
+    args = parser.parse_args()
+
+    transcribe_batch(args.inputs, args.output, model_size=args.model, compute_type=args.compute_type,
+                     device=args.device, workers=args.workers, batch_size=args.batch_size, language=args.language)
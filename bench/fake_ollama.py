@@ -0,0 +1,142 @@
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Local stand-in for the Ollama HTTP API (/api/chat and /api/generate) that replays a scripted
+# reply with fixed prompt-eval and per-token timings, optionally asking for tool calls first.
+#
+# Script keys:
+#   reply               text of the answer, streamed word by word
+#   tool_calls          [{"name": ..., "arguments": {...}}] returned to the first request that offers tools
+#   prompt_eval_delay   seconds before the first token (prompt processing)
+#   token_interval      seconds between tokens
+#   tool_reply          answer after the tool results, defaults to `reply`
+
+
+def now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+class FakeOllama:
+    def __init__(self, script=None, host="127.0.0.1", port=0):
+        self.script = script or {}
+        self.requests = 0
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                fake.requests += 1
+                if self.path == "/api/chat":
+                    fake.chat(self, body)
+                elif self.path == "/api/generate":
+                    fake.generate(self, body)
+                else:
+                    self.send_error(404)
+
+            def do_GET(self):
+                if self.path in ("/", "/api/version"):
+                    self.send_json({"version": "0.0.0-fake"})
+                else:
+                    self.send_error(404)
+
+            def send_json(self, payload):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.url = f"http://{host}:{self.server.server_address[1]}"
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def chat(self, handler, body):
+        messages = body.get("messages", [])
+        model = body.get("model", "fake")
+        has_tool_results = any(m.get("role") == "tool" for m in messages[-8:])
+        tool_calls = self.script.get("tool_calls") or []
+
+        started = time.perf_counter()
+        time.sleep(self.script.get("prompt_eval_delay", 0.2))
+        prompt_tokens = sum(len(m.get("content") or "") for m in messages) // 4
+
+        if body.get("tools") and tool_calls and not has_tool_results:
+            tokens = []
+            calls = [{"function": {"name": c["name"], "arguments": c.get("arguments", {})}} for c in tool_calls]
+        else:
+            reply = self.script.get("tool_reply" if has_tool_results else "reply", self.script.get("reply", "Okay."))
+            words = reply.split(" ")
+            tokens = [w if i == 0 else " " + w for i, w in enumerate(words)]
+            calls = []
+
+        final = {
+            "model": model, "created_at": now(), "done": True, "done_reason": "stop",
+            "total_duration": 0, "load_duration": 0,
+            "prompt_eval_count": prompt_tokens, "prompt_eval_duration": 0,
+            "eval_count": len(tokens), "eval_duration": 0,
+        }
+
+        if not body.get("stream", True):
+            message = {"role": "assistant", "content": "".join(tokens)}
+            if calls:
+                message["tool_calls"] = calls
+            time.sleep(self.script.get("token_interval", 0.03) * len(tokens))
+            final.update(message=message, total_duration=int((time.perf_counter() - started) * 1e9))
+            handler.send_json(final)
+            return
+
+        handler.send_response(200)
+        handler.send_header("Content-Type", "application/x-ndjson")
+        handler.send_header("Transfer-Encoding", "chunked")
+        handler.end_headers()
+
+        def send(payload):
+            line = (json.dumps(payload) + "\n").encode("utf-8")
+            handler.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+            handler.wfile.flush()
+
+        prompt_done = time.perf_counter()
+        try:
+            if calls:
+                send({"model": model, "created_at": now(), "done": False,
+                      "message": {"role": "assistant", "content": "", "tool_calls": calls}})
+            for token in tokens:
+                send({"model": model, "created_at": now(), "done": False,
+                      "message": {"role": "assistant", "content": token}})
+                time.sleep(self.script.get("token_interval", 0.03))
+            finished = time.perf_counter()
+            final.update(message={"role": "assistant", "content": ""},
+                         total_duration=int((finished - started) * 1e9),
+                         prompt_eval_duration=int((prompt_done - started) * 1e9),
+                         eval_duration=int((finished - prompt_done) * 1e9))
+            send(final)
+            handler.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client cancelled the generation
+
+    def generate(self, handler, body):
+        time.sleep(self.script.get("load_delay", 0.0))
+        handler.send_json({"model": body.get("model", "fake"), "created_at": now(), "response": "",
+                           "done": True, "done_reason": "load"})
+
+
+if __name__ == "__main__":
+    server = FakeOllama({"reply": "Hello! This is the fake Ollama server speaking."}, port=11435).start()
+    print(f"[BENCH] Fake Ollama on {server.url}")
+    threading.Event().wait()
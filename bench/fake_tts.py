@@ -0,0 +1,82 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Local stand-in for the Kokoro-FastAPI /v1/audio/speech endpoint. It streams silent 24 kHz
+# 16-bit PCM whose length follows the text, with a fixed delay before the first chunk and
+# audio produced `speed_factor` times faster than real time.
+
+SAMPLE_RATE = 24000
+
+
+class FakeTTS:
+    def __init__(self, first_chunk_delay=0.15, seconds_per_char=0.06, speed_factor=5.0, host="127.0.0.1", port=0):
+        self.first_chunk_delay = first_chunk_delay
+        self.seconds_per_char = seconds_per_char
+        self.speed_factor = speed_factor
+        self.requests = 0
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                if self.path != "/v1/audio/speech":
+                    self.send_error(404)
+                    return
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                fake.requests += 1
+                fake.speech(self, body.get("input", ""))
+
+            def do_GET(self):
+                if self.path in ("/health", "/v1/models"):
+                    data = b'{"status": "healthy"}'
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                else:
+                    self.send_error(404)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.url = f"http://{host}:{self.server.server_address[1]}"
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def speech(self, handler, text):
+        handler.send_response(200)
+        handler.send_header("Content-Type", "audio/pcm")
+        handler.send_header("Transfer-Encoding", "chunked")
+        handler.end_headers()
+
+        total = int(len(text) * self.seconds_per_char * SAMPLE_RATE) * 2
+        chunk = b"\x00" * 4800  # 0.1 s of audio
+        time.sleep(self.first_chunk_delay)
+        try:
+            sent = 0
+            while sent < total:
+                data = chunk[:total - sent]
+                handler.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                handler.wfile.flush()
+                sent += len(data)
+                time.sleep(len(data) / 2 / SAMPLE_RATE / self.speed_factor)
+            handler.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+if __name__ == "__main__":
+    server = FakeTTS(port=8881).start()
+    print(f"[BENCH] Fake Kokoro on {server.url}")
+    threading.Event().wait()
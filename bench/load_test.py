@@ -0,0 +1,98 @@
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from fake_ollama import FakeOllama
+
+# Load test for server mode: starts the assistant server against the fake Ollama and lets
+# many clients, each with its own session, ask questions at the same time over the streaming
+# HTTP endpoint. Reports time to the first sentence, turn time, throughput and refusals.
+#
+#   python bench/load_test.py --clients 16 --questions 3 --max-concurrent 4
+
+QUESTIONS = ["Tell me something about the moon.", "How are you today?", "Give me a fun fact about cats."]
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))] if values else None
+
+
+async def client(http, base, questions, results):
+    async with http.post(f"{base}/sessions") as response:
+        session = (await response.json())["session"]
+    for i in range(questions):
+        started = time.perf_counter()
+        first = None
+        async with http.post(f"{base}/sessions/{session}/ask", json={"text": QUESTIONS[i % len(QUESTIONS)]}) as response:
+            if response.status != 200:
+                results["refused"].append(response.status)
+                continue
+            async for line in response.content:
+                event = json.loads(line)
+                if event["type"] == "sentence" and first is None:
+                    first = time.perf_counter() - started
+                elif event["type"] == "error":
+                    results["errors"] += 1
+        results["first_sentence"].append(first)
+        results["turn"].append(time.perf_counter() - started)
+    await http.delete(f"{base}/sessions/{session}")
+
+
+async def main(args):
+    import aiohttp
+    from aiohttp import web
+    from server import AssistantServer
+
+    fake = FakeOllama({"reply": "Here is a short answer. It has two sentences.",
+                       "prompt_eval_delay": args.prompt_eval_delay, "token_interval": args.token_interval}).start()
+    server = AssistantServer("bench", ollama_host=fake.url, max_concurrent=args.max_concurrent,
+                             session_queue=args.questions, max_queued=args.max_queued, router=False)
+    runner = web.AppRunner(server.app())
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    base = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+    results = {"first_sentence": [], "turn": [], "refused": [], "errors": 0}
+    started = time.perf_counter()
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=None)) as http:
+        await asyncio.gather(*(client(http, base, args.questions, results) for _ in range(args.clients)))
+    elapsed = time.perf_counter() - started
+
+    await runner.cleanup()
+    fake.stop()
+
+    first = [v for v in results["first_sentence"] if v is not None]
+    summary = {
+        "clients": args.clients,
+        "max_concurrent": args.max_concurrent,
+        "turns": len(results["turn"]),
+        "refused": len(results["refused"]),
+        "errors": results["errors"],
+        "turns_per_s": round(len(results["turn"]) / elapsed, 2),
+        "first_sentence_p50_s": round(statistics.median(first), 3) if first else None,
+        "first_sentence_p95_s": round(percentile(first, 95), 3) if first else None,
+        "turn_p50_s": round(statistics.median(results["turn"]), 3) if results["turn"] else None,
+        "turn_p95_s": round(percentile(results["turn"], 95), 3) if results["turn"] else None,
+    }
+    print(json.dumps(summary, indent=2))
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent sessions against the assistant server")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--questions", type=int, default=3)
+    parser.add_argument("--max-concurrent", type=int, default=4)
+    parser.add_argument("--max-queued", type=int, default=64)
+    parser.add_argument("--prompt-eval-delay", type=float, default=0.2)
+    parser.add_argument("--token-interval", type=float, default=0.02)
+    asyncio.run(main(parser.parse_args()))
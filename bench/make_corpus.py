@@ -0,0 +1,78 @@
+import argparse
+import json
+import sys
+import urllib.request
+import wave
+from pathlib import Path
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# Builds the listener corpus (bench/corpus/*.wav) by speaking typical commands through
+# Kokoro, so every machine benchmarks the same audio without shipping recordings.
+# command_noisy is the same speech with seeded fan-like noise mixed in at `--snr` dB.
+#
+#   python bench/make_corpus.py                 needs Kokoro on localhost:8880
+#   python bench/make_corpus.py --url http://gpu-box:8880/v1/audio/speech
+
+CORPUS_DIR = Path(__file__).resolve().parent / "corpus"
+SAMPLE_RATE = 16000
+KOKORO_RATE = 24000
+
+COMMANDS = [
+    "Hey Jowie, what's the weather in Brussels?",
+    "Jowie, set a timer for ten minutes.",
+    "Hey Jowie, who won the last Formula One race?",
+    "Jowie, what's the date today?",
+]
+
+
+def speak(url, text, voice="af_heart"):
+    payload = {"model": "kokoro", "input": text, "voice": voice, "response_format": "pcm", "stream": False}
+    request = urllib.request.Request(url, data=json.dumps(payload).encode("utf-8"),
+                                     headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=60) as response:
+        pcm = np.frombuffer(response.read(), dtype="<i2").astype(np.float32) / 32768
+    # 24 kHz -> 16 kHz; linear interpolation is plenty for speech below 8 kHz
+    positions = np.arange(int(len(pcm) * SAMPLE_RATE / KOKORO_RATE)) * KOKORO_RATE / SAMPLE_RATE
+    return np.interp(positions, np.arange(len(pcm)), pcm).astype(np.float32)
+
+
+def add_noise(audio, snr_db, seed=0):
+    # White noise low-passed into a fan-like rumble, scaled against the speech level
+    rng = np.random.default_rng(seed)
+    noise = np.convolve(rng.standard_normal(len(audio)), np.ones(8) / 8, mode="same").astype(np.float32)
+    speech = audio[np.abs(audio) > 0.01]
+    speech_rms = np.sqrt(np.mean(speech ** 2)) if len(speech) else 0.1
+    noise *= speech_rms / (np.sqrt(np.mean(noise ** 2)) * 10 ** (snr_db / 20))
+    return np.clip(audio + noise, -1.0, 1.0)
+
+
+def write_wav(path, audio):
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes((audio * 32767).astype("<i2").tobytes())
+    print(f"[CORPUS] Wrote {path} ({len(audio) / SAMPLE_RATE:.1f}s)")
+
+
+if __name__ == "__main__":
+    from jawieVoice import KOKORO_URL
+
+    parser = argparse.ArgumentParser(description="Generate the listener benchmark corpus with Kokoro")
+    parser.add_argument("--url", default=KOKORO_URL)
+    parser.add_argument("--snr", type=float, default=10.0, help="speech-to-noise ratio of command_noisy.wav")
+    parser.add_argument("--pause", type=float, default=1.5, help="silence between commands in seconds")
+    args = parser.parse_args()
+
+    gap = np.zeros(int(args.pause * SAMPLE_RATE), dtype=np.float32)
+    parts = [gap]
+    for command in COMMANDS:
+        parts += [speak(args.url, command), gap]
+    clean = np.concatenate(parts)
+
+    CORPUS_DIR.mkdir(exist_ok=True)
+    write_wav(CORPUS_DIR / "command_clean.wav", clean)
+    write_wav(CORPUS_DIR / "command_noisy.wav", add_noise(clean, args.snr))
@@ -0,0 +1,226 @@
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+import numpy as np
+
+try:
+    import resource  # not available on Windows
+except ImportError:
+    resource = None
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from fake_ollama import FakeOllama
+from fake_tts import FakeTTS, SAMPLE_RATE
+
+# Offline end-to-end benchmark. Listener scenarios replay WAV files through SmartListener's
+# endpointing and Whisper; dialogue scenarios run AIEngine against a scripted fake Ollama
+# and JawieVoice against a fake Kokoro, playing into a null sound card. Results can be
+# stored as a baseline and later runs compared against it. The listener corpus is generated
+# with bench/make_corpus.py.
+#
+#   python bench/run_bench.py                   run everything, compare with bench/baseline.json
+#   python bench/run_bench.py --save-baseline   store this run as the new baseline
+
+BENCH_DIR = Path(__file__).resolve().parent
+SCENARIOS_FILE = BENCH_DIR / "scenarios.json"
+BASELINE_FILE = BENCH_DIR / "baseline.json"
+RESULTS_FILE = BENCH_DIR / "results.json"
+
+# Metrics where lower is better; only these count as regressions
+COMPARED = ("rtf", "endpoint_delay_s", "stt_s", "first_token_s", "first_audio_s", "turn_s", "peak_mb")
+# Smallest absolute increase that can count as a regression; a heap peak well under a megabyte
+# moves by more than the relative tolerance from run to run on unchanged code
+MIN_CHANGE = {"peak_mb": 1.0}
+
+
+class NullOutput:
+    # Stands in for the sound card: takes samples at playback speed and throws them away
+    def start(self):
+        pass
+
+    def abort(self):
+        pass
+
+    def write(self, samples):
+        time.sleep(len(samples) / SAMPLE_RATE)
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / 1024 / (1024 if sys.platform == "darwin" else 1), 1)
+
+
+def measure(run):
+    # Runs one scenario and adds its Python heap peak (and the process RSS peak) to the result
+    tracemalloc.start()
+    try:
+        result = run()
+    finally:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    result["peak_mb"] = round(peak / 1024 / 1024, 2)
+    result["rss_peak_mb"] = peak_rss_mb()
+    return result
+
+
+def wait_until_quiet(voice, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while voice.is_speaking() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def run_listener(scenario, voice):
+    path = ROOT / scenario["wav"]
+    if not path.exists():
+        print(f"[BENCH] Skipping {scenario['name']}: {path} not found, run bench/make_corpus.py first")
+        return None
+
+    from faster_whisper import decode_audio
+    from smartListener import SmartListener
+    from telemetry import TRACER
+
+    listener = SmartListener(model_size=scenario.get("model_size", "medium.en"), use_vad=True, tts=voice,
+                             wake_gate=scenario.get("wake_gate", False))
+    listener.callback = lambda text: None
+    # Enough trailing silence for the endpoint to fire after the last word
+    silence = np.zeros(int(listener.max_silence_duration * 2 * listener.fs), dtype=np.float32)
+    audio = np.concatenate((decode_audio(str(path), sampling_rate=listener.fs).astype(np.float32), silence))
+    listener.model.load()  # model loading is not part of the measurement
+
+    def run():
+        stt_seconds, audio_seconds, delays, texts = 0.0, 0.0, [], []
+        for start in range(0, len(audio), listener.chunk_size):
+            utterance = listener.segment(audio[start:start + listener.chunk_size].copy())
+            if utterance is None:
+                continue
+            # Audio time between the end of speech and the endpoint decision
+            delays.append(TRACER.snapshot()["turns"][listener.last_turn]["values"]["endpointing_delay_seconds"])
+            started = time.perf_counter()
+            texts.append(listener.finish_utterance(utterance.copy()) or "")
+            stt_seconds += time.perf_counter() - started
+            audio_seconds += len(utterance) / listener.fs
+        return {
+            "utterances": len(delays),
+            "stt_s": round(stt_seconds, 3),
+            "rtf": round(stt_seconds / audio_seconds, 3) if audio_seconds else None,
+            "endpoint_delay_s": round(statistics.mean(delays), 3) if delays else None,
+            "text": " | ".join(texts),
+        }
+
+    return measure(run)
+
+
+def run_dialogue(scenario, fake_ollama, voice, repeat):
+    from AIEngine import AIEngine
+    from telemetry import TRACER
+
+    fake_ollama.script = scenario["ollama"]
+    # The router would answer simple tool questions itself; these scenarios measure the LLM path
+    ai = AIEngine("bench", tts=voice, host=fake_ollama.url, router=False)
+    for name, tool in scenario.get("tools", {}).items():
+        ai.available_functions[name] = lambda _tool=tool, **args: (time.sleep(_tool.get("latency", 0.0)), _tool["result"])[1]
+
+    def run():
+        runs = []
+        for _ in range(repeat):
+            ai.reset()
+            turn = TRACER.new_turn()
+            started = time.perf_counter()
+            ai.ask(scenario["question"], turn=turn)
+            wait_until_quiet(voice)
+            values = TRACER.snapshot()["turns"][turn]["values"]
+            runs.append({
+                "first_token_s": values.get("llm_first_token_seconds"),
+                "first_audio_s": values.get("turn_first_audio_seconds"),
+                "turn_s": time.perf_counter() - started,
+            })
+        return {key: round(statistics.median(r[key] for r in runs if r[key] is not None), 3)
+                if any(r[key] is not None for r in runs) else None
+                for key in runs[0]}
+
+    return measure(run)
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, metrics in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        for key in COMPARED:
+            old, new = before.get(key), metrics.get(key)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            regressed = change > tolerance and new - old >= MIN_CHANGE.get(key, 0.0)
+            flag = "REGRESSION" if regressed else ""
+            print(f"  {name:<24} {key:<18} {old:>9} -> {new:>9} ({change:+.1%}) {flag}")
+            if flag:
+                regressions.append((name, key))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="J.A.W.I.E. offline latency benchmark")
+    parser.add_argument("--scenarios", default=SCENARIOS_FILE)
+    parser.add_argument("--only", help="run only scenarios whose name contains this")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed slowdown before flagging")
+    args = parser.parse_args()
+
+    from telemetry import TRACER
+    from jawieVoice import JawieVoice
+
+    TRACER.enabled = True
+    scenarios = json.loads(Path(args.scenarios).read_text(encoding="utf-8"))
+    fake_ollama = FakeOllama().start()
+    fake_tts = FakeTTS(**scenarios.get("tts", {})).start()
+    voice = JawieVoice(url=f"{fake_tts.url}/v1/audio/speech", cache=False, output=NullOutput())
+
+    results = {}
+    for scenario in scenarios.get("listener", []):
+        if args.only and args.only not in scenario["name"]:
+            continue
+        print(f"[BENCH] Listener scenario {scenario['name']}")
+        result = run_listener(scenario, voice)
+        if result:
+            results[scenario["name"]] = result
+    for scenario in scenarios.get("dialogue", []):
+        if args.only and args.only not in scenario["name"]:
+            continue
+        print(f"[BENCH] Dialogue scenario {scenario['name']}")
+        results[scenario["name"]] = run_dialogue(scenario, fake_ollama, voice, args.repeat)
+
+    fake_ollama.stop()
+    fake_tts.stop()
+
+    print("\n[BENCH] Results")
+    print(json.dumps(results, indent=2))
+    RESULTS_FILE.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    baseline_file = Path(args.baseline)
+    if args.save_baseline:
+        baseline_file.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"[BENCH] Baseline saved to {baseline_file}")
+        return 0
+    if baseline_file.exists():
+        print(f"\n[BENCH] Compared with {baseline_file}")
+        regressions = compare(results, json.loads(baseline_file.read_text(encoding="utf-8")), args.tolerance)
+        if regressions:
+            print(f"[BENCH] {len(regressions)} regression(s)")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
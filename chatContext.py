@@ -0,0 +1,153 @@
+import threading
+import ollama
+
+SUMMARY_PROMPT = """
+    Summarize the conversation below between a user and Jowie, a voice assistant.
+    Keep facts, names, places, preferences and open questions that may matter later.
+    Leave out greetings and small talk. Write at most a few short sentences.
+"""
+
+
+def count_tokens(message):
+    # Rough estimate (about 4 characters per token for English) plus per-message overhead;
+    # close enough to budget a prompt without loading the model's tokenizer
+    return len(message.get("content") or "") // 4 + 4
+
+
+class ChatContext:
+    # Keeps the prompt sent to Ollama within a token budget: the system prompt and the most
+    # recent turns stay verbatim, old tool results are shortened, and older turns are folded
+    # into a running summary that is written in the background.
+    def __init__(self, system_prompt, model, max_tokens=3000, keep_turns=4, tool_result_chars=300, summarize=True,
+                 client=None):
+        self.system_prompt = system_prompt
+        self.client = client or ollama
+        self.model = model
+        self.max_tokens = max_tokens
+        self.keep_turns = keep_turns
+        self.tool_result_chars = tool_result_chars
+        self.summarize = summarize
+        self.lock = threading.Lock()
+        self.generation = 0
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.history = []        # (message, tokens) after the system prompt
+            self.summary = ""
+            self.to_summarize = []   # evicted messages waiting for the summarizer
+            self.summarizer = None
+            self.generation += 1  # a summary still being written for the old conversation is discarded
+
+    def append(self, message):
+        with self.lock:
+            if message["role"] == "user":
+                self._compact_tool_results()
+            self.history.append((message, count_tokens(message)))
+            self._enforce_budget()
+
+    def rollback(self, message):
+        # Drops `message` and everything appended after it, e.g. the user turn of a cancelled answer
+        with self.lock:
+            for i, (kept, _) in enumerate(self.history):
+                if kept is message:
+                    del self.history[i:]
+                    return True
+        return False
+
+    def messages(self):
+        with self.lock:
+            system = self.system_prompt
+            if self.summary:
+                system += f"\n\n## Earlier in this conversation\n{self.summary}"
+            return [{"role": "system", "content": system}] + [message for message, _ in self.history]
+
+    def token_count(self):
+        with self.lock:
+            return count_tokens({"content": self.system_prompt + self.summary}) + sum(t for _, t in self.history)
+
+    def _compact_tool_results(self):
+        # Tool output only matters for the turn that asked for it; later turns get a short version
+        for i, (message, _) in enumerate(self.history):
+            content = message.get("content") or ""
+            if message["role"] == "tool" and len(content) > self.tool_result_chars:
+                message = dict(message, content=content[:self.tool_result_chars].rstrip() + " …")
+                self.history[i] = (message, count_tokens(message))
+
+    def _enforce_budget(self):
+        budget = self.max_tokens - count_tokens({"content": self.system_prompt + self.summary})
+        total = sum(t for _, t in self.history)
+        if total <= budget:
+            return
+
+        # Never evict the last `keep_turns` turns; a turn starts at a user message
+        user_turns = [i for i, (message, _) in enumerate(self.history) if message["role"] == "user"]
+        if len(user_turns) <= self.keep_turns:
+            return
+        protected = user_turns[-self.keep_turns]
+
+        cut = 0
+        for start in user_turns[1:]:
+            if start > protected or total <= budget:
+                break
+            total -= sum(t for _, t in self.history[cut:start])
+            cut = start
+        if cut == 0:
+            return
+
+        evicted = [message for message, _ in self.history[:cut]]
+        del self.history[:cut]
+        if self.summarize:
+            self.to_summarize.extend(evicted)
+            self._start_summarizer()
+
+    def _start_summarizer(self):
+        # Called with the lock held. The summarizer clears self.summarizer under the same lock
+        # when it finds nothing left to do, so new messages are never left without a thread.
+        if self.summarizer:
+            return  # the running summarizer picks up the new messages when it is done
+        self.summarizer = threading.Thread(target=self._summarize, daemon=True)
+        self.summarizer.start()
+
+    def _summarizer_done(self):
+        # Called with the lock held; a reset may already have started another summarizer
+        if self.summarizer is threading.current_thread():
+            self.summarizer = None
+
+    def _summarize(self):
+        while True:
+            with self.lock:
+                if self.summarizer is not threading.current_thread():
+                    return  # replaced after a reset
+                if not self.to_summarize:
+                    self.summarizer = None
+                    return
+                messages, self.to_summarize = self.to_summarize, []
+                previous = self.summary
+                generation = self.generation
+
+            transcript = "\n".join(f"{m['role']}: {m.get('content') or ''}" for m in messages)
+            if previous:
+                transcript = f"Summary so far: {previous}\n\n{transcript}"
+            try:
+                response = self.client.chat(
+                    model=self.model,
+                    messages=[{"role": "system", "content": SUMMARY_PROMPT},
+                              {"role": "user", "content": transcript}],
+                )
+                summary = response['message']['content'].strip()
+            except Exception as e:
+                print(f"[CONTEXT] Summary failed: {e}")
+                with self.lock:
+                    if generation == self.generation:
+                        # Keep them for the next attempt, which starts with the next eviction
+                        self.to_summarize[:0] = messages
+                    self._summarizer_done()
+                return
+
+            with self.lock:
+                if generation != self.generation:
+                    self._summarizer_done()
+                    return
+                self.summary = summary
+            print(f"[CONTEXT] Summarized {len(messages)} older messages")
@@ -0,0 +1,157 @@
+import argparse
+import os
+import time
+from settings import SETTINGS_FILE, load_settings, update_settings
+
+# Named Whisper decode settings. "command" is tuned for short spoken commands (greedy, no
+# timestamps, language pinned), "dictation" for accuracy on longer speech. Load options
+# (cpu_threads, num_workers) become part of the model's registry key; decode options are
+# passed to every transcribe() call. The calibration command times the profiles on this
+# machine and stores the best one that keeps up in settings.json.
+
+class DecodeProfile:
+    def __init__(self, name, beam_size=1, best_of=1, temperature=0.0, without_timestamps=True,
+                 condition_on_previous_text=False, language="en", initial_prompt=None, vad_filter=False,
+                 cpu_threads=0, num_workers=1):
+        self.name = name
+        self.beam_size = beam_size
+        self.best_of = best_of
+        self.temperature = temperature  # a tuple enables fallback to the next temperature on bad output
+        self.without_timestamps = without_timestamps
+        self.condition_on_previous_text = condition_on_previous_text
+        self.language = language  # None lets the multilingual models detect it on every call
+        self.initial_prompt = initial_prompt
+        self.vad_filter = vad_filter
+        self.cpu_threads = cpu_threads  # 0 lets CTranslate2 pick
+        self.num_workers = num_workers
+
+    @property
+    def load_options(self):
+        return {"cpu_threads": self.cpu_threads, "num_workers": self.num_workers}
+
+    @property
+    def decode_options(self):
+        return {
+            "beam_size": self.beam_size,
+            "best_of": self.best_of,
+            "temperature": self.temperature,
+            "without_timestamps": self.without_timestamps,
+            "condition_on_previous_text": self.condition_on_previous_text,
+            "language": self.language,
+            "initial_prompt": self.initial_prompt,
+            "vad_filter": self.vad_filter,
+        }
+
+    def with_options(self, **options):
+        profile = DecodeProfile(self.name)
+        profile.__dict__.update(self.__dict__)
+        profile.__dict__.update(options)
+        return profile
+
+    def __repr__(self):
+        return f"DecodeProfile({self.name}, beam={self.beam_size}, threads={self.cpu_threads or 'auto'})"
+
+
+PROFILES = {
+    "command": DecodeProfile("command"),
+    "balanced": DecodeProfile("balanced", beam_size=3, best_of=3, temperature=(0.0, 0.2, 0.4)),
+    "dictation": DecodeProfile("dictation", beam_size=5, best_of=5, temperature=(0.0, 0.2, 0.4, 0.6, 0.8, 1.0),
+                               without_timestamps=False, condition_on_previous_text=True),
+}
+
+# Most accurate first; calibration keeps the first one that meets the target
+ACCURACY_ORDER = ["dictation", "balanced", "command"]
+
+
+def alias_prompt(aliases):
+    # Primes Whisper with the assistant's real name (the first alias) only; listing the
+    # "Joey"/"Jerry" lookalikes would push the decoder towards them instead
+    return f"Hey {aliases[0].capitalize()}." if aliases else "Hey Jowie."
+
+
+def load_profile(name=None, aliases=(), settings=None):
+    # The named profile, or the calibrated one from settings.json, with the alias prompt
+    if settings is None:
+        settings = load_settings()
+    name = name or settings.get("decode_profile", "command")
+    profile = PROFILES[name].with_options(initial_prompt=alias_prompt(aliases))
+    if name == settings.get("decode_profile") and settings.get("decode_cpu_threads") is not None:
+        profile = profile.with_options(cpu_threads=settings["decode_cpu_threads"])
+    return profile
+
+
+def measure(audio, profile, model_size, compute_type, download_root, repeats=2, fs=16000):
+    # Real-time factor (decode seconds per second of audio), best of `repeats` after a warm-up
+    from whisperRegistry import REGISTRY
+    model = REGISTRY.get(model_size, compute_type, download_root=download_root, **profile.load_options)
+    key = REGISTRY.key(model_size, compute_type, **profile.load_options)
+    try:
+        list(model.transcribe(audio[:fs * 2], **profile.decode_options)[0])
+        best, text = None, ""
+        for _ in range(repeats):
+            started = time.perf_counter()
+            segments, _ = model.transcribe(audio, **profile.decode_options)
+            text = " ".join(seg.text for seg in segments).strip()  # segments are decoded lazily
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best / (len(audio) / fs), text
+    finally:
+        REGISTRY.unload(key)  # one model at a time during calibration
+
+
+def calibrate(audio, model_size="medium.en", compute_type="int8", download_root="models/", target_rtf=0.3,
+              thread_options=None, aliases=(), repeats=2):
+    # Finds the fastest thread count for each profile, then picks the most accurate profile
+    # whose best time meets `target_rtf`; falls back to the fastest configuration overall
+    cpus = os.cpu_count() or 4
+    thread_options = thread_options or sorted({max(1, cpus // 4), max(1, cpus // 2), cpus})
+    results = {}
+    for name in ACCURACY_ORDER:
+        for threads in thread_options:
+            profile = load_profile(name, aliases, settings={}).with_options(cpu_threads=threads)
+            rtf, text = measure(audio, profile, model_size, compute_type, download_root, repeats)
+            print(f"[CALIBRATE] {name:<10} {threads:>2} threads  RTF {rtf:.3f}  {text[:60]!r}")
+            if name not in results or rtf < results[name][1]:
+                results[name] = (threads, rtf)
+
+    for name in ACCURACY_ORDER:
+        threads, rtf = results[name]
+        if rtf <= target_rtf:
+            return name, threads, rtf, results
+    name = min(results, key=lambda n: results[n][1])
+    print(f"[CALIBRATE] No profile meets RTF {target_rtf}, using the fastest")
+    return name, results[name][0], results[name][1], results
+
+
+def save_choice(name, threads):
+    update_settings(decode_profile=name, decode_cpu_threads=threads)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the Whisper decode profiles and store the best one")
+    parser.add_argument("--audio", help="a recording of typical commands; records from the microphone if omitted")
+    parser.add_argument("--record-seconds", type=float, default=6.0)
+    parser.add_argument("--model", default="medium.en")
+    parser.add_argument("--compute-type", default="int8")
+    parser.add_argument("--target-rtf", type=float, default=0.3, help="decode time per second of audio to stay under")
+    parser.add_argument("--threads", help="comma-separated cpu_threads values to try")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    from smartListener import ASSISTANT_ALIASES
+
+    if args.audio:
+        from faster_whisper import decode_audio
+        audio = decode_audio(args.audio, sampling_rate=16000)
+    else:
+        from transcriber import Transcriber
+        print("[CALIBRATE] Say a few typical commands...")
+        audio = Transcriber().record_audio(args.record_seconds)
+
+    threads = [int(t) for t in args.threads.split(",")] if args.threads else None
+    name, threads, rtf, _ = calibrate(audio, args.model, args.compute_type, target_rtf=args.target_rtf,
+                                      thread_options=threads, aliases=ASSISTANT_ALIASES)
+    print(f"[CALIBRATE] Selected {name} with {threads} threads (RTF {rtf:.3f})")
+    if not args.no_save:
+        save_choice(name, threads)
+        print(f"[CALIBRATE] Saved to {SETTINGS_FILE}")
@@ -0,0 +1,80 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Shared HTTP clients: one pooled, keep-alive session per name, so the TTS worker and the
+# tools reuse their TCP connections instead of setting one up for every request.
+
+DEFAULT_TIMEOUT = (3.05, 30)  # (connect, read) seconds
+
+
+class HttpClient:
+    def __init__(self, timeout=DEFAULT_TIMEOUT, retries=2, backoff=0.2, pool_size=8):
+        self.timeout = timeout
+        self.session = requests.Session()
+        # Retries cover connection errors and overloaded servers; a response that already
+        # started streaming is never retried
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"GET", "HEAD", "POST"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+class AsyncHttpClient:
+    # Same idea for asyncio code; needs the optional httpx package
+    def __init__(self, timeout=DEFAULT_TIMEOUT, retries=2, pool_size=8):
+        try:
+            import httpx
+        except ImportError as e:
+            raise ImportError("AsyncHttpClient needs httpx: pip install httpx") from e
+        connect, read = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(read, connect=connect),
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            transport=httpx.AsyncHTTPTransport(retries=retries),
+        )
+
+    async def get(self, url, **kwargs):
+        return await self.client.get(url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.client.post(url, **kwargs)
+
+    def stream(self, method, url, **kwargs):
+        return self.client.stream(method, url, **kwargs)
+
+    async def close(self):
+        await self.client.aclose()
+
+
+_clients = {}
+_lock = threading.Lock()
+
+
+def get_client(name="default", **options):
+    # Options only apply the first time a client with this name is created
+    with _lock:
+        client = _clients.get(name)
+        if client is None:
+            client = _clients[name] = HttpClient(**options)
+        return client
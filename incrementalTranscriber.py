@@ -0,0 +1,79 @@
+import re
+
+# Re-decodes the uncommitted part of an ongoing utterance and commits the words that two
+# consecutive hypotheses agree on (LocalAgreement-2). Committed audio is never decoded again,
+# so when speech ends only the short unstable tail is left to transcribe.
+
+
+def normalize_word(word):
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+class IncrementalTranscriber:
+    def __init__(self, model, fs=16000, on_partial=None, on_final=None, min_step=1.0, max_window=15.0, decode_options=None):
+        self.model = model
+        self.fs = fs
+        self.on_partial = on_partial
+        self.on_final = on_final
+        self.min_step = int(min_step * fs)      # new audio needed before re-decoding
+        self.max_window = int(max_window * fs)  # longest stretch we are willing to re-decode
+        self.decode_options = decode_options or {}
+        self.reset()
+
+    def reset(self):
+        self.committed = []       # words that are final
+        self.tentative = []       # (word, end_sample) from the last hypothesis, after the committed prefix
+        self.commit_sample = 0    # utterance offset where the uncommitted audio starts
+        self.decoded_until = 0
+
+    def update(self, audio):
+        # `audio` is the whole utterance so far, indexed from its first sample
+        if len(audio) - self.decoded_until < self.min_step:
+            return
+        self.decoded_until = len(audio)
+
+        hypothesis = self._decode(audio)
+        agreed = 0
+        for (old, _), (new, _) in zip(self.tentative, hypothesis):
+            if normalize_word(old) != normalize_word(new):
+                break
+            agreed += 1
+
+        # Without agreement the window keeps growing; cap it by committing its oldest words
+        if agreed == 0 and len(audio) - self.commit_sample > self.max_window:
+            horizon = len(audio) - self.max_window // 2
+            agreed = sum(1 for _, end in hypothesis if end <= horizon)
+
+        if agreed:
+            self.committed.extend(word for word, _ in hypothesis[:agreed])
+            self.commit_sample = hypothesis[agreed - 1][1]
+        self.tentative = hypothesis[agreed:]
+
+        if self.on_partial:
+            self.on_partial(self.text(self.committed), self.text(w for w, _ in self.tentative))
+
+    def finish(self, audio):
+        tail = self._decode(audio) if len(audio) > self.commit_sample else []
+        text = self.text(self.committed + [word for word, _ in tail])
+        self.reset()
+        if self.on_final:
+            self.on_final(text)
+        return text
+
+    def _decode(self, audio):
+        window = audio[self.commit_sample:]
+        prompt = self.text(self.committed[-30:]) or None
+        # Word timing and the committed-text prompt are needed here, whatever the profile says
+        options = dict(self.decode_options, word_timestamps=True, without_timestamps=False,
+                       initial_prompt=prompt or self.decode_options.get("initial_prompt"),
+                       condition_on_previous_text=False)
+        segments, _ = self.model.transcribe(window, **options)
+        words = []
+        for seg in segments:
+            for w in seg.words or []:
+                words.append((w.word, self.commit_sample + int(w.end * self.fs)))
+        return words
+
+    @staticmethod
+    def text(words):
+        return "".join(words).strip()
@@ -0,0 +1,118 @@
+import re
+import threading
+
+# Answers the most common tool questions without the LLM. An utterance is only routed when
+# the whole of it (after the wake word and politeness) matches one of the patterns below;
+# everything else, including anything with extra conditions, goes to the model as before.
+
+GREETING = r"(?:(?:hey|hi|hello|hallo|hei|ok|okay)[\s,]+)?"
+POLITE_PREFIX = re.compile(r"^(?:please\s+|(?:can|could|would|will)\s+you\s+(?:please\s+)?(?:tell\s+me\s+|check\s+)?"
+                           r"|(?:do\s+you\s+know|tell\s+me|i\s+want\s+to\s+know|i'd\s+like\s+to\s+know)\s+)+")
+POLITE_SUFFIX = re.compile(r"(?:\s+(?:please|for\s+me|thanks|thank\s+you))+$")
+
+DATE_PATTERNS = [
+    re.compile(r"(?:what(?:'s|\s+is)\s+)?(?:the\s+)?(?:date|day)(?:\s+(?:today|it\s+is|is\s+it))?"),
+    re.compile(r"(?:what(?:'s|\s+is)\s+)?today'?s\s+date"),
+    re.compile(r"what\s+(?:date|day)\s+is\s+(?:it|today)(?:\s+today)?"),
+    re.compile(r"what(?:'s|\s+is)\s+today"),
+]
+
+WEATHER_PATTERNS = [
+    re.compile(r"(?:(?:what(?:'s|\s+is)|how(?:'s|\s+is))\s+)?(?:the\s+)?weather(?:\s+like)?"
+               r"(?:\s+(?:in|for|at)\s+(?P<city>[a-z][a-z .'-]*?))?(?:\s+(?:today|right\s+now|now|currently))?"),
+    re.compile(r"(?:what(?:'s|\s+is)|how(?:'s|\s+is))\s+the\s+weather\s+(?:like\s+)?(?:today\s+|now\s+)?(?:in|for|at)\s+"
+               r"(?P<city>[a-z][a-z .'-]*?)"),
+]
+
+# Words that make a weather question about something the current-conditions tool cannot answer
+NOT_A_CITY = {"tomorrow", "tonight", "weekend", "week", "next", "later", "forecast", "yesterday", "morning",
+              "afternoon", "evening", "monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday",
+              "it", "there", "here", "the", "my", "your", "and", "or", "in", "at", "for"}
+
+DATE_RESULT = re.compile(r"^\w+day, \w+ \d{1,2} \d{4}$")
+
+WEATHER_RESULT = re.compile(r"^The weather in .+? is: (?P<condition>.+?)\s+(?P<temp>[+-]?\d+)°(?P<unit>[CF])"
+                            r"(?:\s+\W*(?P<wind>\d+)\s*(?P<wind_unit>km/h|mph|m/s))?\.?$")
+
+
+class Route:
+    def __init__(self, tool, args=None):
+        self.tool = tool
+        self.args = args or {}
+
+    def __repr__(self):
+        return f"Route({self.tool}, {self.args})"
+
+
+class IntentRouter:
+    def __init__(self, aliases=(), default_city=None):
+        names = "|".join(re.escape(alias) for alias in aliases)
+        self.wake = re.compile(rf"^{GREETING}(?:(?:{names})\b\s*,?\s*)" if names else rf"^{GREETING}(?=\S+\s*,)\S+\s*,\s*")
+        self.default_city = default_city  # used for "what's the weather", otherwise that goes to the LLM
+        self.lock = threading.Lock()
+        self.hits = {}
+        self.misses = 0
+
+    def normalize(self, text):
+        text = " ".join(text.lower().replace("’", "'").split())
+        # The wake word goes first: without aliases it is only recognised by its comma
+        text = self.wake.sub("", text)
+        text = re.sub(r"[^\w\s'.-]", " ", text)
+        text = " ".join(text.split()).strip(" .,-")
+        text = POLITE_PREFIX.sub("", text)
+        return POLITE_SUFFIX.sub("", text).strip(" .,-")
+
+    def match(self, text):
+        # The Route for an utterance, or None when it is not an unambiguous tool question
+        text = self.normalize(text)
+        if any(pattern.fullmatch(text) for pattern in DATE_PATTERNS):
+            return Route("get_date")
+        for pattern in WEATHER_PATTERNS:
+            found = pattern.fullmatch(text)
+            if not found:
+                continue
+            city = (found.group("city") or "").strip(" .'-")
+            if not city:
+                return Route("get_weather", {"city": self.default_city}) if self.default_city else None
+            words = city.split()
+            if len(words) > 3 or NOT_A_CITY.intersection(words):
+                return None
+            return Route("get_weather", {"city": city.title()})
+        return None
+
+    def route(self, text):
+        # match() plus hit-rate bookkeeping; call once per user turn
+        route = self.match(text)
+        with self.lock:
+            if route:
+                self.hits[route.tool] = self.hits.get(route.tool, 0) + 1
+            else:
+                self.misses += 1
+        return route
+
+    def render(self, route, result):
+        # Spoken answer for a tool result, or None when the result is not the expected shape
+        # (an error or a timeout message), so the question goes to the LLM after all
+        result = str(result).strip()
+        if route.tool == "get_date":
+            return f"Today is {result}." if DATE_RESULT.match(result) else None
+        if route.tool == "get_weather":
+            found = WEATHER_RESULT.match(result)
+            if not found:
+                return None
+            unit = "degrees" if found["unit"] == "C" else "degrees Fahrenheit"
+            temp = int(found["temp"])
+            temp = f"minus {-temp}" if temp < 0 else str(temp)
+            answer = f"Right now in {route.args['city']}: {found['condition'].lower()}, {temp} {unit}"
+            if found["wind"]:
+                speed = {"km/h": "kilometers per hour", "mph": "miles per hour", "m/s": "meters per second"}
+                answer += f", wind at {int(found['wind'])} {speed[found['wind_unit']]}"
+            return answer + "."
+        return None
+
+    def stats(self):
+        with self.lock:
+            hits = sum(self.hits.values())
+            total = hits + self.misses
+            return {"hits": dict(self.hits), "misses": self.misses,
+                    "hit_rate": round(hits / total, 3) if total else 0.0}
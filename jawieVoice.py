@@ -1,64 +1,175 @@
-import requests
-import soundfile as sf
+import numpy as np
 import sounddevice as sd
-import io
 import threading
 import queue
+import time
+from httpClient import get_client
+from audioCache import AudioCache
+from telemetry import TRACER
+
+KOKORO_URL = "http://localhost:8880/v1/audio/speech"
+SAMPLE_RATE = 24000  # Kokoro emits 24 kHz, 16-bit, mono raw PCM
+CHUNK_BYTES = 4096
+END_OF_UTTERANCE = None
 
 class JawieVoice:
-    def __init__(self):
+    def __init__(self, url=KOKORO_URL, voice="af_heart", speed=1.0, lang_code="a", prefetch_seconds=10.0,
+                 cache=True, max_cached_chars=200, output=None):
         print("[ORION TTS] Kokoro streaming voice active")
+        self.url = url
+        self.voice = voice
+        self.speed = speed
+        self.lang_code = lang_code
+        self.http = get_client("tts", timeout=(2, 30))
+        # Synthesized audio is kept on disk; short phrases that come back play without a TTS round trip
+        self.cache = AudioCache() if cache is True else cache or None
+        self.max_cached_chars = max_cached_chars
         self.q = queue.Queue()
+        # PCM chunks between the synthesis and playback workers. While one utterance plays,
+        # the synthesis worker is already fetching the next one into this queue.
+        self.audio_q = queue.Queue(maxsize=max(1, int(prefetch_seconds * SAMPLE_RATE * 2 / CHUNK_BYTES)))
+        # `output` replaces the sound card with anything that has start/write/abort (benchmarks use a null sink)
+        self.stream = output or sd.OutputStream(samplerate=SAMPLE_RATE, channels=1, dtype="int16", latency="low")
+        self.stream.start()
+        self.stream_lock = threading.Lock()
+        # Bumped by interrupt(); audio from an older generation is dropped instead of played
+        self.generation = 0
+        self.synthesizing = False
+        self.playing = False
         self.worker = threading.Thread(target=self._run, daemon=True)
         self.worker.start()
+        self.player = threading.Thread(target=self._play, daemon=True)
+        self.player.start()
 
     def _run(self):
         while True:
-            text = self.q.get()
-            if not text.strip():
-                continue
+            generation, turn, text = self.q.get()
+            if not text.strip() or generation != self.generation:
+                continue  # queued before an interrupt()
+            TRACER.event("tts_request", turn, once=True)
+            requested = time.monotonic()
+            self.synthesizing = True
             try:
-                payload = {
-                    "model": "kokoro",
-                    "input": text,
-                    "voice": "af_heart",
-                    "response_format": "wav",
-                    "download_format": "mp3",
-                    "speed": 1.0,
-                    "stream": True,
-                    "return_download_link": False,
-                    "lang_code": "a",
-                    "volume_multiplier": 1.0,
-                    "normalization_options": {
-                        "normalize": True,
-                        "unit_normalization": False,
-                        "url_normalization": True,
-                        "email_normalization": True,
-                        "optional_pluralization_normalization": True,
-                        "phone_normalization": True,
-                        "replace_remaining_symbols": True
-                    }
-                }
-
-                response = requests.post(
-                    "http://localhost:8880/v1/audio/speech", json=payload, stream=True)
-                response.raise_for_status()
-
-                buf = io.BytesIO()
-                for chunk in response.iter_content(chunk_size=8192):
-                    buf.write(chunk)
-                buf.seek(0)
-
-                data, fs = sf.read(buf, dtype="float32")
-                sd.play(data, fs)
-                sd.wait()
+                key = self.cache.key(text, self.voice, self.speed, self.lang_code) if self.cache else None
+                pcm = self.cache.get(key) if key else None
+                if pcm is not None:
+                    TRACER.count("tts_cache_hits", 1, turn)
+                    for i in range(0, len(pcm), CHUNK_BYTES):
+                        self.audio_q.put((generation, turn, pcm[i:i + CHUNK_BYTES]))
+                    continue
+
+                chunks = []
+                for chunk in self._synthesize(text):
+                    if generation != self.generation:
+                        break  # interrupted: stop downloading audio nobody will hear
+                    if not chunks:
+                        TRACER.observe("tts_first_chunk_seconds", time.monotonic() - requested, turn)
+                    self.audio_q.put((generation, turn, chunk))
+                    chunks.append(chunk)
+                else:
+                    if key and len(text) <= self.max_cached_chars:
+                        self.cache.put(key, b"".join(chunks))
 
             except Exception as e:
                 print(f"[TTS Error] {e}")
+            finally:
+                self.synthesizing = False
+                self.audio_q.put((generation, turn, END_OF_UTTERANCE))
 
-    def speak(self, text: str):
-        # process the text to remove the json actions
-        text = text.replace('"action":', "").replace('"params":', "").replace('"', "")
-        self.q.put(text)
+    def _synthesize(self, text):
+        # Yields whole 16-bit samples as Kokoro streams them
+        payload = {
+            "model": "kokoro",
+            "input": text,
+            "voice": self.voice,
+            "response_format": "pcm",
+            "speed": self.speed,
+            "stream": True,
+            "return_download_link": False,
+            "lang_code": self.lang_code,
+            "volume_multiplier": 1.0,
+            "normalization_options": {
+                "normalize": True,
+                "unit_normalization": False,
+                "url_normalization": True,
+                "email_normalization": True,
+                "optional_pluralization_normalization": True,
+                "phone_normalization": True,
+                "replace_remaining_symbols": True
+            }
+        }
+
+        with self.http.post(self.url, json=payload, stream=True) as response:
+            response.raise_for_status()
+
+            leftover = b""  # a chunk can end halfway through a sample
+            for chunk in response.iter_content(chunk_size=CHUNK_BYTES):
+                data = leftover + chunk
+                cut = len(data) - len(data) % 2
+                leftover = data[cut:]
+                if cut:
+                    yield data[:cut]
+
+    def warm_up(self, phrases):
+        # Renders fixed phrases into the audio cache in the background, so the first time
+        # they are said they already play from disk. Warm phrases are never evicted.
+        if not self.cache:
+            return
+
+        def render():
+            for phrase in phrases:
+                text = self.clean(phrase)
+                key = self.cache.key(text, self.voice, self.speed, self.lang_code)
+                if key in self.cache:
+                    self.cache.pin(key)
+                    continue
+                try:
+                    self.cache.put(key, b"".join(self._synthesize(text)), pinned=True)
+                except Exception as e:
+                    print(f"[TTS Cache] Warm-up failed for {phrase!r}: {e}")
+            print(f"[TTS Cache] {len(phrases)} phrases ready")
+
+        threading.Thread(target=render, daemon=True).start()
 
+    def _play(self):
+        while True:
+            generation, turn, chunk = self.audio_q.get()
+            if chunk is END_OF_UTTERANCE or generation != self.generation:
+                self.playing = not self.audio_q.empty()
+                continue
+            self.playing = True
+            TRACER.event("first_audio", turn, once=True)
+            try:
+                samples = np.frombuffer(chunk, dtype="<i2").reshape(-1, 1)
+                with self.stream_lock:
+                    self.stream.write(samples)
+            except Exception as e:
+                print(f"[TTS Error] {e}")
+
+    def is_speaking(self):
+        return self.playing or self.synthesizing or not self.q.empty() or not self.audio_q.empty()
+
+    def interrupt(self):
+        # Barge-in: forget queued text and audio, stop the synthesis in flight and
+        # drop what is already buffered in the output device
+        self.generation += 1
+        for q in (self.q, self.audio_q):
+            while True:
+                try:
+                    q.get_nowait()
+                except queue.Empty:
+                    break
+        with self.stream_lock:
+            self.stream.abort()
+            self.stream.start()
+        self.playing = False
+
+    @staticmethod
+    def clean(text: str) -> str:
+        # process the text to remove the json actions
+        return text.replace('"action":', "").replace('"params":', "").replace('"', "")
 
+    def speak(self, text: str, turn=None):
+        # `turn` links the synthesis and playback timings to the turn that produced the text
+        # The generation is taken now, so text spoken before an interrupt() never plays after it
+        self.q.put((self.generation, turn if turn is not None else TRACER.current_turn, self.clean(text)))
@@ -1,33 +1,75 @@
-from smartListener import SmartListener
-from transcriber import Transcriber
-from jawieVoice import JawieVoice
-from AIEngine import AIEngine
+from settings import load_settings
+from startup import WarmStart, load_whisper, preload_ollama, check_kokoro
+from decodeProfiles import load_profile
 
 import os
 os.add_dll_directory(r"C:\\Program Files\\NVIDIA\\CUDNN\\v9.10\\bin\\12.9")
 
 print("[MAIN] Booting J.A.W.I.E. Voice Assistant...")
 
-transcriber = Transcriber()
-OrionVoice = JawieVoice()
-ai = AIEngine("phi3:3.8b")
+LLM_MODEL = "phi3:3.8b"
+LISTENER_MODEL = "medium.en"
+WAKE_MODEL = "tiny.en"
 
-transcriber.select_device()
+# Start the slow work first: Whisper loads, the Ollama model load and the Kokoro check run
+# in the background while the rest of the assistant is imported and built
+boot = WarmStart()
+settings = load_settings()
+keep_alive = settings.get("ollama_keep_alive", "30m")
+# Same load options as the listener's decode profile, or the registry would load a second copy
+profile = load_profile(settings=settings)
+boot.run("whisper " + LISTENER_MODEL, load_whisper, LISTENER_MODEL, **profile.load_options)
+boot.run("whisper " + WAKE_MODEL, load_whisper, WAKE_MODEL)
+boot.run("ollama " + LLM_MODEL, preload_ollama, LLM_MODEL, keep_alive=keep_alive)
+boot.run("kokoro", check_kokoro)
 
-def on_user_spoke_to_assistant(transcript):
-    print(f"[MAIN] User spoke to Jawie: {transcript}")
-    response = ai.ask(transcript)
-    if response:
-        OrionVoice.speak(response)
-    else:
-        OrionVoice.speak("Sorry, I didn't understand that.")
+with boot.phase("imports"):
+    from smartListener import SmartListener, ASSISTANT_ALIASES
+    from transcriber import Transcriber
+    from jawieVoice import JawieVoice
+    from AIEngine import AIEngine
+    from pipeline import AssistantPipeline
+    from telemetry import TRACER
 
-# Initialize the smart listener
-listener = SmartListener(model_size="medium.en", use_vad=True,
-                         questionCallback=on_user_spoke_to_assistant)
+# Only ask for a microphone when none has been saved yet
+with boot.phase("input device"):
+    transcriber = Transcriber()
+    if transcriber.device is None:
+        transcriber.select_device()
+
+GREETING = "Hello, I am Jowie. Please let me know if I can assist you with anything."
+NOT_UNDERSTOOD = "Sorry, I didn't understand that."
+
+with boot.phase("voice and engine"):
+    OrionVoice = JawieVoice()
+    # "what's the weather" without a city is only answered directly when a home city is set
+    ai = AIEngine(LLM_MODEL, tts=OrionVoice, keep_alive=keep_alive, aliases=ASSISTANT_ALIASES,
+                  default_city=settings.get("home_city"))
+
+    # Pre-render the fixed phrases so they play from the audio cache instead of waiting on Kokoro
+    OrionVoice.warm_up(settings.get("tts_warm_phrases") or [GREETING, NOT_UNDERSTOOD, *ai.tool_announcements.values()])
+
+# Per-turn latency breakdown on http://127.0.0.1:9464/metrics (enable with "tracing": true or JAWIE_TRACE=1)
+if settings.get("tracing"):
+    TRACER.enabled = True
+if TRACER.enabled:
+    TRACER.serve(settings.get("metrics_port", 9464))
+
+# Initialize the smart listener; after a 0.4 s pause Ollama already starts on the answer,
+# which is used if the user does not go on talking
+with boot.phase("listener"):
+    listener = SmartListener(model_size=LISTENER_MODEL, use_vad=True, wake_gate=True, wake_model_size=WAKE_MODEL,
+                             device_idx=transcriber.device, tts=OrionVoice,
+                             speculative_pause=settings.get("speculative_pause", 0.4))
+
+# The assistant can hear as soon as the Whisper models are in; Ollama may still be loading
+boot.wait("whisper " + LISTENER_MODEL, "whisper " + WAKE_MODEL, "kokoro")
+boot.report()
 
 # Optional: Initial greeting
-OrionVoice.speak("Hello, I am Jowie. Please let me know if I can assist you with anything.")
+OrionVoice.speak(GREETING)
 
-# Start continuous listening
-listener.listen()
+# Start continuous listening; capture, STT, dialogue and speech run concurrently. Saying
+# "Jowie ..." over an answer interrupts it; use "barge_in": "voice" only with a headset
+AssistantPipeline(listener, ai, OrionVoice, barge_in=settings.get("barge_in", "wake"),
+                  not_understood=NOT_UNDERSTOOD).run()
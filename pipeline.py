@@ -0,0 +1,166 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from audioCapture import AudioCapture
+
+# The assistant as concurrent stages joined by bounded queues:
+#   capture -> endpointing (VAD) -> STT -> dialogue -> JawieVoice (synthesis -> playback)
+# Whisper and Ollama run on their own worker threads, so the microphone is read the whole
+# time a turn is in progress. Speech during playback can interrupt the assistant (barge-in):
+#   "wake"  only once the wake gate heard the assistant's name ("Jowie, stop"), safe with speakers
+#   "voice" on any voiced audio, only for headsets, where Jowie's own voice cannot reach the mic
+#   "off"   never; a new question still replaces the answer once it is transcribed
+
+
+class CallbackDialogue:
+    # Dialogue stage that hands each transcript to a plain callback (SmartListener.listen())
+    def __init__(self, callback):
+        self.callback = callback
+
+    def ask(self, text, cancel=None, turn=None):
+        self.callback(text)
+        return text
+
+    def speculate(self, text):
+        pass
+
+    def discard_speculation(self):
+        pass
+
+
+class AssistantPipeline:
+    def __init__(self, listener, ai, tts, queue_size=8, barge_in="wake", barge_in_duration=0.4, not_understood=None):
+        self.listener = listener
+        self.ai = ai
+        self.tts = tts
+        self.queue_size = queue_size
+        self.barge_in_mode = barge_in
+        # Voiced audio needed before playback is interrupted; keeps clicks and short noises from
+        # cutting it off. It does not stop echo or a TV, which is what the "wake" mode is for.
+        self.barge_in_samples = int(barge_in_duration * listener.fs)
+        self.not_understood = not_understood
+        self.cancel = None        # threading.Event of the turn in progress
+        self.barged_in = False    # already interrupted for the current utterance
+        self.partial_pending = False  # update_partial work queued for the STT stage
+        self.mic = AudioCapture(listener.fs, listener.device)
+        # Speculation (listener.speculative_pause): the last pause the user talked past, and
+        # (pause, transcript) of the last pause that was transcribed and handed to the AI early
+        self.stale_pause = None
+        self.speculated = None
+
+    def run(self):
+        asyncio.run(self.main())
+
+    async def main(self):
+        self.loop = asyncio.get_running_loop()
+        self.audio_q = asyncio.Queue(maxsize=self.queue_size * 4)
+        self.utterance_q = asyncio.Queue(maxsize=self.queue_size)
+        self.text_q = asyncio.Queue(maxsize=self.queue_size)
+        self.stt_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="jowie-stt")
+        self.dialogue_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="jowie-dialogue")
+        await asyncio.gather(self.capture(), self.endpointing(), self.speech_to_text(), self.dialogue())
+
+    async def capture(self):
+        # The PortAudio callback fills the capture ring; chunks are taken from it here. If
+        # endpointing falls behind, audio waits in the ring (backlog) instead of being dropped.
+        size = self.listener.chunk_size
+        poll = self.mic.block_size / self.mic.fs / 2
+        with self.mic:
+            print("[PIPELINE] Listening...")
+            while True:
+                chunk = self.mic.read_nowait(size)
+                if chunk is None:
+                    await asyncio.sleep(poll)
+                else:
+                    await self.audio_q.put(chunk)
+
+    async def endpointing(self):
+        while True:
+            chunk = await self.audio_q.get()
+            audio = self.listener.segment(chunk)
+
+            if self.listener.pause_audio is not None:
+                await self.utterance_q.put(("pause", None, self.listener.pause_audio, self.listener.pauses))
+                self.listener.pause_audio = None
+            if self.listener.speech_resumed:
+                # The user kept talking, so the early reply is for an unfinished question
+                self.listener.speech_resumed = False
+                self.stale_pause = self.listener.pauses
+                self.speculated = None
+                self.ai.discard_speculation()
+
+            if not self.barged_in and self.should_barge_in():
+                self.barged_in = True
+                await self.barge_in()
+
+            if audio is None and not self.partial_pending and self.listener.wants_partial():
+                # Early wake check and incremental decoding while the user is still talking;
+                # at most one is queued, a backlog of them would only be stale
+                self.partial_pending = True
+                await self.utterance_q.put(("partial", None, self.listener.utterance_so_far(), None))
+
+            if audio is not None:
+                self.barged_in = False
+                # The ring is overwritten by the next chunks, so STT gets its own copy
+                await self.utterance_q.put(("final", self.listener.last_turn, audio.copy(), self.listener.endpoint_pause))
+
+    async def speech_to_text(self):
+        while True:
+            kind, turn, audio, pause = await self.utterance_q.get()
+            if kind == "pause":
+                await self.speculate(audio, pause)
+                continue
+            if kind == "partial":
+                await self.loop.run_in_executor(self.stt_pool, self.listener.update_partial, audio)
+                self.partial_pending = False
+                continue
+
+            # Nothing was said after the pause: its transcript is the final one
+            transcript = self.speculated[1] if self.speculated and self.speculated[0] == pause else None
+            self.speculated = None
+            text = await self.loop.run_in_executor(self.stt_pool, self.listener.finish_utterance, audio, turn,
+                                                   transcript)
+            if not text:
+                continue
+            if self.cancel and not self.cancel.is_set():
+                await self.barge_in()  # a new question replaces the one still being answered
+            await self.text_q.put((turn, text))
+
+    async def speculate(self, audio, pause):
+        # Transcribes at a short pause and lets the AI start on the reply; only while no other
+        # turn is being answered, so the speculation does not compete with a live one
+        if self.cancel and not self.cancel.is_set():
+            return
+        text = await self.loop.run_in_executor(self.stt_pool, self.listener.transcribe_pause, audio)
+        if text and pause != self.stale_pause:
+            self.speculated = (pause, text)
+            self.ai.speculate(text)
+
+    async def dialogue(self):
+        while True:
+            turn, text = await self.text_q.get()
+            print(f"[MAIN] User spoke to Jawie: {text}")
+            cancel = self.cancel = threading.Event()
+            try:
+                reply = await self.loop.run_in_executor(self.dialogue_pool, self.ai.ask, text, cancel, turn)
+            except Exception as e:
+                print(f"[PIPELINE] Dialogue failed: {e}")
+                reply = None
+            if not reply and not cancel.is_set() and self.not_understood:
+                self.tts.speak(self.not_understood, turn)
+            cancel.set()  # marks the turn as finished
+
+    def should_barge_in(self):
+        if self.barge_in_mode == "off" or self.listener.speech_samples < self.barge_in_samples:
+            return False
+        if self.barge_in_mode == "wake" and self.listener.wake_decision is not True:
+            return False
+        return self.tts.is_speaking()
+
+    async def barge_in(self):
+        print("[PIPELINE] Barge-in: stopping the current answer")
+        if self.cancel:
+            self.cancel.set()
+        while not self.text_q.empty():
+            self.text_q.get_nowait()  # questions queued before the interruption are stale
+        await self.loop.run_in_executor(None, self.tts.interrupt)
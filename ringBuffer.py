@@ -0,0 +1,77 @@
+import numpy as np
+
+
+class AudioRingBuffer:
+    # Fixed-capacity float32 ring buffer. Every sample is stored twice (at i and i + capacity),
+    # so the most recent n samples are always one contiguous slice and can be handed out
+    # as a view without copying.
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.data = np.zeros(capacity * 2, dtype=np.float32)
+        self.pos = 0      # next write index, in [0, capacity)
+        self.filled = 0   # number of valid samples, at most capacity
+
+    def write(self, samples: np.ndarray):
+        n = len(samples)
+        if n >= self.capacity:
+            samples = samples[-self.capacity:]
+            n = self.capacity
+        cap = self.capacity
+        first = min(n, cap - self.pos)
+        self.data[self.pos:self.pos + first] = samples[:first]
+        self.data[self.pos + cap:self.pos + cap + first] = samples[:first]
+        rest = n - first
+        if rest:
+            self.data[:rest] = samples[first:]
+            self.data[cap:cap + rest] = samples[first:]
+        self.pos = (self.pos + n) % cap
+        self.filled = min(cap, self.filled + n)
+
+    def latest(self, n: int) -> np.ndarray:
+        # The returned view is only valid until the next write overwrites it
+        n = min(n, self.filled)
+        end = self.pos + self.capacity
+        return self.data[end - n:end]
+
+    def clear(self):
+        self.pos = 0
+        self.filled = 0
+
+
+class SampleQueue:
+    # Single-producer/single-consumer FIFO for handing samples out of an audio callback.
+    # The producer only ever advances `written` and the consumer only `read`, so neither side
+    # takes a lock; when the consumer falls behind, new blocks are dropped and counted.
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.data = np.zeros(capacity, dtype=np.float32)
+        self.written = 0  # total samples pushed (producer side)
+        self.read = 0     # total samples popped (consumer side)
+        self.dropped = 0  # samples refused because the queue was full
+
+    def available(self) -> int:
+        return self.written - self.read
+
+    def push(self, samples: np.ndarray) -> bool:
+        n = len(samples)
+        if n > self.capacity - (self.written - self.read):
+            self.dropped += n
+            return False
+        start = self.written % self.capacity
+        first = min(n, self.capacity - start)
+        self.data[start:start + first] = samples[:first]
+        self.data[:n - first] = samples[first:]
+        self.written += n  # publish only once the samples are in place
+        return True
+
+    def pop(self, max_samples: int = None) -> np.ndarray:
+        n = self.written - self.read
+        if max_samples is not None:
+            n = min(n, max_samples)
+        start = self.read % self.capacity
+        first = min(n, self.capacity - start)
+        out = np.empty(n, dtype=np.float32)
+        out[:first] = self.data[start:start + first]
+        out[first:] = self.data[:n - first]
+        self.read += n
+        return out
@@ -0,0 +1,110 @@
+import re
+
+THINK_OPEN = "<think>"
+THINK_CLOSE = "</think>"
+
+EMOJI_PATTERN = re.compile(
+    "[\U0001F600-\U0001F64F"  # Emoticons
+    "\U0001F300-\U0001F5FF"  # Symbols & Pictographs
+    "\U0001F680-\U0001F6FF"  # Transport & Map Symbols
+    "\U0001F1E0-\U0001F1FF"  # Flags
+    "\U00002700-\U000027BF"  # Dingbats
+    "\U000024C2-\U0001F251"  # Enclosed Characters
+    "]+", flags=re.UNICODE)
+
+# A sentence ends at . ! ? (plus closing quotes/brackets) followed by whitespace, or at a newline
+SENTENCE_END = re.compile(r"[.!?…]+[\"')\]]*\s+|\n+")
+CLAUSE_END = re.compile(r"[,;:–—]\s+")
+
+# Words that end with a period without ending the sentence
+ABBREVIATIONS = {"mr", "mrs", "ms", "dr", "st", "vs", "etc", "e.g", "i.e", "approx", "no"}
+
+
+def partial_suffix(text, tag):
+    # Length of the longest tail of `text` that could be the start of `tag`
+    for k in range(min(len(tag) - 1, len(text)), 0, -1):
+        if text.endswith(tag[:k]):
+            return k
+    return 0
+
+
+# Turns a stream of LLM tokens into clean, speakable sentence-sized pieces
+class SentenceStreamer:
+    def __init__(self, on_sentence, min_clause_chars=40):
+        self.on_sentence = on_sentence
+        self.min_clause_chars = min_clause_chars
+        self.pending = ""    # raw text that may still hold part of a <think> tag
+        self.buffer = ""     # cleaned text waiting for a boundary
+        self.in_think = False
+
+    def feed(self, token):
+        self.pending += token
+        self._strip_think()
+        self._emit_complete()
+
+    def flush(self):
+        # Whatever is left over is spoken as-is, unless we are still inside <think>
+        if not self.in_think:
+            self.buffer += EMOJI_PATTERN.sub("", self.pending)
+        self.pending = ""
+        self._emit(self.buffer)
+        self.buffer = ""
+        self.in_think = False
+
+    def _strip_think(self):
+        visible = []
+        while self.pending:
+            if self.in_think:
+                end = self.pending.find(THINK_CLOSE)
+                if end == -1:
+                    keep = partial_suffix(self.pending, THINK_CLOSE)
+                    self.pending = self.pending[len(self.pending) - keep:]
+                    break
+                self.pending = self.pending[end + len(THINK_CLOSE):]
+                self.in_think = False
+            else:
+                start = self.pending.find(THINK_OPEN)
+                if start == -1:
+                    keep = partial_suffix(self.pending, THINK_OPEN)
+                    visible.append(self.pending[:len(self.pending) - keep])
+                    self.pending = self.pending[len(self.pending) - keep:]
+                    break
+                visible.append(self.pending[:start])
+                self.pending = self.pending[start + len(THINK_OPEN):]
+                self.in_think = True
+        self.buffer += EMOJI_PATTERN.sub("", "".join(visible))
+
+    def _emit_complete(self):
+        while True:
+            cut = self._find_boundary()
+            if cut is None:
+                return
+            self._emit(self.buffer[:cut])
+            self.buffer = self.buffer[cut:]
+
+    def _find_boundary(self):
+        for match in SENTENCE_END.finditer(self.buffer):
+            if not self._is_abbreviation(match.start()):
+                return match.end()
+        # Long sentences are split at clauses so the first audio is not held back
+        if len(self.buffer) >= self.min_clause_chars:
+            for match in CLAUSE_END.finditer(self.buffer, self.min_clause_chars // 2):
+                return match.end()
+        return None
+
+    def _is_abbreviation(self, end):
+        if self.buffer[end] != ".":
+            return False
+        words = self.buffer[:end].split()
+        return bool(words) and words[-1].lower().lstrip("(\"'") in ABBREVIATIONS
+
+    def _emit(self, text):
+        text = text.strip()
+        if text:
+            self.on_sentence(text)
+
+
+def clean_tts(text):
+    # remove all thinking content
+    text = re.sub(r"<think>.*?</think>", "", text, flags=re.DOTALL)
+    return EMOJI_PATTERN.sub("", text)
@@ -0,0 +1,302 @@
+import argparse
+import asyncio
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from AIEngine import AIEngine
+from telemetry import TRACER
+
+try:
+    from aiohttp import web, WSMsgType  # optional: only needed for the server mode
+except ImportError:
+    web = WSMsgType = None
+
+# Server mode: one process hosting many independent conversations (rooms, devices, web
+# clients). Every session has its own AIEngine, so history, tool state and speculation are
+# never shared. Turns wait in a small per-session queue and then for one of `max_concurrent`
+# slots in front of Ollama; full queues are refused (429/503) instead of piling up.
+#
+#   POST   /sessions                 -> {"session": id}
+#   POST   /sessions/{id}/ask        {"text": ...} -> NDJSON stream of sentence/done events
+#   GET    /sessions/{id}/ws         WebSocket: {"type": "ask", "text": ...} / {"type": "cancel"}
+#   DELETE /sessions/{id}
+#   GET    /health, /metrics
+
+
+class Busy(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class TextVoice:
+    # Stands in for JawieVoice in a session: spoken sentences go to the client, not the speakers
+    def __init__(self):
+        self.on_sentence = None
+
+    def speak(self, text, turn=None):
+        if self.on_sentence and text:
+            self.on_sentence(text)
+
+    def is_speaking(self):
+        return False
+
+    def interrupt(self):
+        pass
+
+
+class Turn:
+    def __init__(self, text, loop):
+        self.text = text
+        self.loop = loop
+        self.events = asyncio.Queue()
+        self.cancel = threading.Event()
+        self.submitted = time.monotonic()
+
+    def emit(self, event):
+        # Safe from the engine's worker thread
+        self.loop.call_soon_threadsafe(self.events.put_nowait, event)
+
+    async def stream(self):
+        while True:
+            event = await self.events.get()
+            yield event
+            if event["type"] in ("done", "error"):
+                return
+
+
+class Session:
+    def __init__(self, server, session_id):
+        self.server = server
+        self.id = session_id
+        self.voice = TextVoice()
+        self.ai = AIEngine(server.model, tts=self.voice, host=server.ollama_host, keep_alive=server.keep_alive,
+                           **server.engine_options)
+        self.queue = asyncio.Queue(maxsize=server.session_queue)
+        self.waiting = set()  # turns in the queue, so they can be cancelled
+        self.current = None
+        self.last_active = time.monotonic()
+        self.worker = asyncio.create_task(self.run())
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            turn = await self.queue.get()
+            self.waiting.discard(turn)
+            self.server.queued -= 1
+            if turn.cancel.is_set():
+                turn.emit({"type": "done", "reply": None, "cancelled": True})
+                continue
+            self.current = turn
+            async with self.server.slots:
+                TRACER.observe("server_queue_seconds", time.monotonic() - turn.submitted)
+                self.voice.on_sentence = lambda sentence: turn.emit({"type": "sentence", "text": sentence})
+                try:
+                    reply = await loop.run_in_executor(self.server.pool, self.ai.ask, turn.text, turn.cancel,
+                                                       TRACER.new_turn())
+                    turn.emit({"type": "done", "reply": reply, "cancelled": turn.cancel.is_set()})
+                except asyncio.CancelledError:
+                    # The session was closed mid-turn; the stream still gets its last event
+                    turn.cancel.set()
+                    turn.emit({"type": "done", "reply": None, "cancelled": True})
+                    raise
+                except Exception as e:
+                    print(f"[SERVER] Session {self.id} failed: {e}")
+                    turn.emit({"type": "error", "error": str(e)})
+                finally:
+                    self.voice.on_sentence = None
+            self.current = None
+            self.last_active = time.monotonic()
+
+    def submit(self, text):
+        if self.server.queued >= self.server.max_queued:
+            raise Busy(503, "Server busy, try again later")
+        turn = Turn(text, asyncio.get_running_loop())
+        try:
+            self.queue.put_nowait(turn)
+        except asyncio.QueueFull:
+            raise Busy(429, "Too many questions waiting in this session")
+        self.waiting.add(turn)
+        self.server.queued += 1
+        self.last_active = time.monotonic()
+        return turn
+
+    def cancel_all(self):
+        if self.current:
+            self.current.cancel.set()
+        for turn in self.waiting:
+            turn.cancel.set()
+
+    def close(self):
+        self.cancel_all()
+        self.worker.cancel()
+        # Turns still waiting will never run: finish their streams and give back their places
+        while not self.queue.empty():
+            turn = self.queue.get_nowait()
+            self.waiting.discard(turn)
+            self.server.queued -= 1
+            turn.emit({"type": "done", "reply": None, "cancelled": True})
+        self.ai.discard_speculation()
+        self.ai.tool_pool.shutdown(wait=False)
+
+
+class AssistantServer:
+    def __init__(self, model="phi3:3.8b", ollama_host=None, max_concurrent=2, session_queue=4, max_queued=64,
+                 session_ttl=1800.0, keep_alive="30m", **engine_options):
+        self.model = model
+        self.ollama_host = ollama_host
+        self.max_concurrent = max_concurrent  # turns running against Ollama at once
+        self.session_queue = session_queue    # turns a session may have waiting
+        self.max_queued = max_queued          # turns waiting over all sessions
+        self.session_ttl = session_ttl
+        self.keep_alive = keep_alive
+        self.engine_options = engine_options
+        self.sessions = {}
+        self.queued = 0
+        self.slots = None
+        self.pool = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix="jowie-session")
+
+    def app(self):
+        if web is None:
+            raise ImportError("Server mode needs aiohttp: pip install aiohttp")
+        app = web.Application()
+        app.add_routes([
+            web.post("/sessions", self.handle_create),
+            web.delete("/sessions/{id}", self.handle_delete),
+            web.post("/sessions/{id}/ask", self.handle_ask),
+            web.get("/sessions/{id}/ws", self.handle_ws),
+            web.get("/health", self.handle_health),
+            web.get("/metrics", self.handle_metrics),
+        ])
+        app.on_startup.append(self.on_startup)
+        app.on_cleanup.append(self.on_cleanup)
+        return app
+
+    async def on_startup(self, app):
+        self.slots = asyncio.Semaphore(self.max_concurrent)
+        self.reaper = asyncio.create_task(self.reap())
+
+    async def on_cleanup(self, app):
+        self.reaper.cancel()
+        for session in list(self.sessions.values()):
+            session.close()
+        self.sessions.clear()
+        self.pool.shutdown(wait=False)
+
+    async def reap(self):
+        # Closes sessions that have been idle for longer than session_ttl
+        while True:
+            await asyncio.sleep(60)
+            now = time.monotonic()
+            for session in list(self.sessions.values()):
+                if session.current is None and session.queue.empty() and now - session.last_active > self.session_ttl:
+                    print(f"[SERVER] Closing idle session {session.id}")
+                    self.sessions.pop(session.id).close()
+
+    def session(self, request):
+        session = self.sessions.get(request.match_info["id"])
+        if session is None:
+            raise web.HTTPNotFound(text="Unknown session")
+        return session
+
+    async def handle_create(self, request):
+        session = Session(self, uuid.uuid4().hex[:12])
+        self.sessions[session.id] = session
+        print(f"[SERVER] Session {session.id} opened ({len(self.sessions)} active)")
+        return web.json_response({"session": session.id}, status=201)
+
+    async def handle_delete(self, request):
+        session = self.session(request)
+        self.sessions.pop(session.id).close()
+        return web.json_response({"closed": session.id})
+
+    async def handle_ask(self, request):
+        session = self.session(request)
+        text = (await request.json()).get("text", "").strip()
+        if not text:
+            raise web.HTTPBadRequest(text="Missing text")
+        try:
+            turn = session.submit(text)
+        except Busy as e:
+            return web.json_response({"error": str(e)}, status=e.status)
+
+        response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+        await response.prepare(request)
+        try:
+            async for event in turn.stream():
+                await response.write((json.dumps(event) + "\n").encode("utf-8"))
+        except (ConnectionResetError, asyncio.CancelledError):
+            turn.cancel.set()  # the client went away, stop generating for it
+            raise
+        await response.write_eof()
+        return response
+
+    async def handle_ws(self, request):
+        session = self.session(request)
+        ws = web.WebSocketResponse(heartbeat=30)
+        await ws.prepare(request)
+        forwarders = set()
+
+        async def forward(turn):
+            async for event in turn.stream():
+                if ws.closed:
+                    turn.cancel.set()
+                    return
+                await ws.send_json(event)
+
+        async for message in ws:
+            if message.type != WSMsgType.TEXT:
+                continue
+            try:
+                payload = json.loads(message.data)
+            except ValueError:
+                await ws.send_json({"type": "error", "error": "Invalid JSON"})
+                continue
+            if payload.get("type") == "cancel":
+                session.cancel_all()
+            elif payload.get("type") == "ask" and payload.get("text"):
+                try:
+                    task = asyncio.create_task(forward(session.submit(payload["text"])))
+                except Busy as e:
+                    await ws.send_json({"type": "busy", "error": str(e), "status": e.status})
+                    continue
+                forwarders.add(task)
+                task.add_done_callback(forwarders.discard)
+
+        session.cancel_all()  # socket closed: nobody is listening to these answers any more
+        for task in forwarders:
+            task.cancel()
+        return ws
+
+    async def handle_health(self, request):
+        return web.json_response({
+            "sessions": len(self.sessions),
+            "queued": self.queued,
+            "running": sum(1 for s in self.sessions.values() if s.current is not None),
+            "max_concurrent": self.max_concurrent,
+        })
+
+    async def handle_metrics(self, request):
+        return web.Response(text=TRACER.to_prometheus(), content_type="text/plain")
+
+    def run(self, bind="127.0.0.1", port=8765):
+        print(f"[SERVER] Serving {self.model} on http://{bind}:{port} ({self.max_concurrent} concurrent turns)")
+        web.run_app(self.app(), host=bind, port=port, print=None)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run J.A.W.I.E. as a multi-session HTTP/WebSocket server")
+    parser.add_argument("--model", default="phi3:3.8b")
+    parser.add_argument("--ollama-host", default=None)
+    parser.add_argument("--bind", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-concurrent", type=int, default=2, help="turns running against Ollama at once")
+    parser.add_argument("--session-queue", type=int, default=4)
+    parser.add_argument("--max-queued", type=int, default=64)
+    args = parser.parse_args()
+
+    TRACER.enabled = True
+    AssistantServer(args.model, ollama_host=args.ollama_host, max_concurrent=args.max_concurrent,
+                    session_queue=args.session_queue, max_queued=args.max_queued).run(args.bind, args.port)
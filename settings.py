@@ -0,0 +1,26 @@
+import json
+from pathlib import Path
+
+# settings.json is shared by several components (input device, decode profile, home city, ...);
+# read it and change single keys through these helpers so nobody overwrites the others' options.
+
+SETTINGS_FILE = Path("settings.json")
+
+
+def load_settings():
+    if not SETTINGS_FILE.exists():
+        return {}
+    try:
+        return json.loads(SETTINGS_FILE.read_text())
+    except ValueError as e:
+        print(f"[SETTINGS] Could not read {SETTINGS_FILE}: {e}")
+        return {}
+
+
+def update_settings(**values):
+    settings = load_settings()
+    settings.update(values)
+    tmp = SETTINGS_FILE.with_suffix(".tmp")
+    tmp.write_text(json.dumps(settings))
+    tmp.replace(SETTINGS_FILE)
+    return settings
@@ -1,86 +1,212 @@
-import time
 import numpy as np
-import sounddevice as sd
-from faster_whisper import WhisperModel
 from vad import VoiceActivityDetector  # Optional: see note below
-import json
 import re
-from pathlib import Path
+from settings import load_settings
 from jawieVoice import JawieVoice
+from whisperRegistry import LazyWhisperModel
+from decodeProfiles import load_profile
+from ringBuffer import AudioRingBuffer
+from audioFrontend import AudioFrontend
+from incrementalTranscriber import IncrementalTranscriber
+from wakeGate import WakeWordGate
+from telemetry import TRACER
+from pipeline import AssistantPipeline, CallbackDialogue
+
+ASSISTANT_ALIASES = ["jowie", "joey", "jowy", "jowey", "jowee", "jerry", "jawie", "joby", "joe", "jeremy"]
+_NAMES = "|".join(ASSISTANT_ALIASES)
 
 INTENT_KEYWORDS = [
-    r"^(hey|hi|hello|hallo|hei)?\s*(jowie|joey|jowy|jowey|jowee|jerry|jawie|joby|joe|jeremy)[,\s]",
-    r"\b(jowie|joey|jowy|jowey|jowee|jerry|jawie|joby|joe|jeremy)\b.*(can you|could you|would you|please|tell me|what|how|do you|show me)",
+    rf"^(hey|hi|hello|hallo|hei)?\s*({_NAMES})[,\s]",
+    rf"\b({_NAMES})\b.*(can you|could you|would you|please|tell me|what|how|do you|show me)",
     r"^(can you|could you|would you|please|tell me|what|how|do you|show me)[,\s]"
 ]
 
-SETTINGS_FILE = "settings.json"
-
 class SmartListener:
-    def __init__(self, model_size="base", model_path="models/", device_idx=None, use_vad=False, questionCallback=None):
+    def __init__(self, model_size="base", model_path="models/", device_idx=None, use_vad=False, questionCallback=None, tts=None,
+                 max_utterance_duration=30.0, pre_roll_duration=0.5, incremental=False, on_partial=None, on_final=None,
+                 wake_gate=False, wake_model_size="tiny.en", noise_suppression=True, speculative_pause=None,
+                 decode_profile=None):
         self.fs = 16000
         self.chunk_size = int(self.fs * 0.5)  # 0.5s chunks
         self.max_silence_duration = 1.2
         self.min_command_duration = 1.0
-        self.model = WhisperModel(model_size, compute_type="int8", download_root=model_path)
+        self.target_dB = -30
+        # Streaming noise suppression ahead of the VAD and smoothed gain on speech, instead of
+        # a fresh gain jump on every chunk
+        self.frontend = AudioFrontend(self.fs, noise_suppression=noise_suppression, target_db=self.target_dB)
+        # Utterance capture: a fixed ring holding the longest allowed utterance plus the
+        # pre-roll, so audio just before VAD triggers (the first syllable) is kept.
+        self.max_utterance_samples = int(self.fs * max_utterance_duration)
+        self.pre_roll_samples = int(self.fs * pre_roll_duration)
+        self.ring = AudioRingBuffer(self.max_utterance_samples + self.pre_roll_samples)
+        self.utterance_samples = 0
+        self.silence_samples = 0  # trailing non-speech audio in the current utterance
+        self.speech_samples = 0   # voiced audio in the current utterance
+        self.last_chunk_speech = False
+        self.last_turn = None     # trace ID of the most recent finished utterance
+        # Speculation: a shorter pause hands out the utterance so far (pause_audio) for an early
+        # transcript and reply. pause_speech_samples is the voiced audio at that pause; any
+        # speech after it sets speech_resumed and makes the early work stale.
+        self.speculative_pause = speculative_pause
+        self.pauses = 0
+        self.pause_audio = None
+        self.pause_speech_samples = None
+        self.speech_resumed = False
+        self.endpoint_pause = None  # pause number the last endpoint still matches, if any
+        # Decode settings: "command" unless another profile is passed or calibrated in settings.json
+        self.profile = load_profile(decode_profile, ASSISTANT_ALIASES)
+        self.model = LazyWhisperModel(model_size, compute_type="int8", download_root=model_path,
+                                      **self.profile.load_options)
         self.device = device_idx or self.load_device()
-        self.tts = JawieVoice()
+        self.tts = tts or JawieVoice()
         self.use_vad = use_vad
         self.callback = questionCallback
         if self.use_vad:
             self.vad = VoiceActivityDetector(sample_rate=self.fs)
+        # Incremental mode decodes while the user is still talking and reports partial hypotheses
+        self.incremental = None
+        if incremental:
+            self.incremental = IncrementalTranscriber(self.model, fs=self.fs, on_partial=on_partial, on_final=on_final,
+                                                      decode_options=self.profile.decode_options)
+        # Wake gate: a tiny model checks the start of each utterance before the full decode runs
+        self.wake_gate = None
+        self.wake_decision = None
+        if wake_gate:
+            self.wake_gate = WakeWordGate(ASSISTANT_ALIASES, INTENT_KEYWORDS, model_size=wake_model_size,
+                                          model_path=model_path, fs=self.fs)
 
 
     def load_device(self):
-        if not Path(SETTINGS_FILE).exists():
-            return None
-        with open(SETTINGS_FILE) as f:
-            return json.load(f).get("input_device")
+        return load_settings().get("input_device")
 
     def listen(self):
+        # Runs the assistant's own pipeline with the callback as the dialogue stage, so this
+        # gets the same capture, early wake check, partials and pause transcripts
+        AssistantPipeline(self, CallbackDialogue(self.callback), self.tts, barge_in="off").run()
+
+    def segment(self, chunk):
+        # Noise suppression, VAD, gain and utterance capture. Returns the finished utterance at an
+        # endpoint (a view into the ring, valid until the next chunk is written), otherwise None.
+        chunk = self.frontend.suppress_noise(chunk)
+        is_speech = True
+        trailing_silence = 0
+        speech = len(chunk)
+        if self.use_vad:
+            # Per-frame mask, so the endpoint is measured to 30 ms instead of to the chunk
+            mask, _ = self.vad.frame_mask(chunk)
+            is_speech = bool(mask.any())
+            speech = int(mask.sum()) * self.vad.frame_size
+            if is_speech:
+                trailing_silence = (len(mask) - 1 - np.flatnonzero(mask)[-1]) * self.vad.frame_size
+        self.last_chunk_speech = is_speech
+
+        chunk = self.frontend.normalize(chunk, speech=is_speech)
+
+        if self.utterance_samples == 0:
+            if not is_speech:
+                # Nothing going on: the ring only serves as pre-roll history
+                self.ring.write(chunk)
+                return None
+            self.utterance_samples = min(self.ring.filled, self.pre_roll_samples)
+
+        self.ring.write(chunk)
+        self.utterance_samples = min(self.utterance_samples + len(chunk), self.ring.capacity)
+        self.speech_samples += speech
+        if self.pause_speech_samples is not None and self.speech_samples > self.pause_speech_samples:
+            self.pause_speech_samples = None
+            self.speech_resumed = True
+
+        if is_speech:
+            self.silence_samples = trailing_silence
+        else:
+            self.silence_samples += len(chunk)
+
+        silence_duration = self.silence_samples / self.fs
+        buffer_duration = self.utterance_samples / self.fs
+
+        endpoint = silence_duration >= self.max_silence_duration and buffer_duration >= self.min_command_duration
+        if not endpoint and self.utterance_samples < self.max_utterance_samples:
+            if (self.speculative_pause is not None and self.pause_speech_samples is None
+                    and silence_duration >= self.speculative_pause and buffer_duration >= self.min_command_duration):
+                self.pauses += 1
+                self.pause_speech_samples = self.speech_samples
+                self.pause_audio = self.ring.latest(self.utterance_samples).copy()
+            return None
+
+        audio = self.ring.latest(self.utterance_samples)  # zero-copy view of the utterance
+        self.last_turn = TRACER.new_turn()
+        TRACER.observe("endpointing_delay_seconds", self.silence_samples / self.fs, self.last_turn)
+        self.endpoint_pause = self.pauses if self.pause_speech_samples == self.speech_samples else None
+        self.pause_speech_samples = None
+        self.utterance_samples = 0
+        self.silence_samples = 0
+        self.speech_samples = 0
+        return audio
+
+    def wants_partial(self):
+        # Whether update_partial() has work for the utterance in progress, so the audio is only
+        # copied out of the ring when something will look at it
+        if not self.utterance_samples:
+            return False
+        if self.wake_gate and self.wake_decision is None and self.utterance_samples >= self.wake_gate.window:
+            return True
+        return bool(self.incremental and self.last_chunk_speech and self.wake_decision is not False)
+
+    def utterance_so_far(self):
+        return self.ring.latest(self.utterance_samples).copy()
+
+    def update_partial(self, audio):
+        # Work done while the user is still talking: the early wake check and partial decodes.
+        # `audio` is a copy of the utterance so far, as this runs off the segmenting thread.
+        if self.wake_gate and self.wake_decision is None and len(audio) >= self.wake_gate.window:
+            self.wake_decision = self.wake_gate.accepts(audio)
+        if self.incremental and self.last_chunk_speech and self.wake_decision is not False:
+            self.incremental.update(audio)
+
+    def transcribe_pause(self, audio):
+        # Early transcript of the utterance so far, taken at a speculative pause. The wake gate
+        # decides first (and its decision is kept for the endpoint), so speech not meant for
+        # the assistant never gets a full decode at a pause either.
+        if self.wake_gate and self.wake_decision is None:
+            self.wake_decision = self.wake_gate.accepts(audio)
+        if self.wake_decision is False:
+            return None
+        transcription = self.transcribe(audio)
+        print(f"[SMART] Transcription at pause: {transcription}")
+        return transcription if self.is_intended_for_assistant(transcription) else None
+
+    def finish_utterance(self, audio, turn=None, transcript=None):
+        # Transcribes a finished utterance; returns the text if it was meant for the assistant.
+        # `transcript` is a pause transcript of the same speech, which makes decoding unnecessary.
+        turn = turn if turn is not None else self.last_turn
+        wake_decision, self.wake_decision = self.wake_decision, None
+        if transcript is not None:
+            if self.incremental:
+                self.incremental.reset()
+            print(f"[SMART] Transcription (from pause): {transcript}")
+            return transcript
+        if self.wake_gate and wake_decision is None:
+            with TRACER.span("wake_gate", turn):
+                wake_decision = self.wake_gate.accepts(audio)
+        if wake_decision is False:
+            if self.incremental:
+                self.incremental.reset()
+            return None
 
-        target_dB = -30
-        with sd.InputStream(samplerate=self.fs, channels=1, dtype='int16', device=self.device) as stream:
-            print("[SMART] Starting intelligent listener active with VAD...")
-            buffer = np.zeros((0,), dtype=np.float32)
-            silence_chunks = 0
-            while True:
-                chunk = stream.read(self.chunk_size)[0].flatten().astype(np.float32) / 32768.0
-                #buffer = np.concatenate((buffer, chunk))
-
-                buffer = np.concatenate((buffer, chunk))
-
-                is_speech = True
-                if self.use_vad:
-                    is_speech = self.vad.is_speech(chunk)
-
-                current_dB = self.calculate_decibels(chunk)
-                if is_speech and -np.inf < current_dB < target_dB:
-                    gain = 10 ** ((target_dB - current_dB) / 20)
-                    chunk *= gain
-
-                if is_speech:
-                    buffer = np.concatenate((buffer, chunk))
-                    silence_chunks = 0
-                else:
-                    silence_chunks += 1
-
-                silence_duration = silence_chunks * (self.chunk_size / self.fs)
-                buffer_duration = len(buffer) / self.fs
-
-                if silence_duration >= self.max_silence_duration and buffer_duration >= self.min_command_duration:
-                    transcription = self.transcribe(buffer)
-                    print(f"[SMART] Transcription: {transcription}")
-                    if self.is_intended_for_assistant(transcription):
-                        time.sleep(0.2)
-                        self.callback(transcription)
-                    else:
-                        print(f"[SMART] Ignored: {transcription}")
-                    buffer = np.zeros((0,), dtype=np.float32)
-                    silence_chunks = 0
+        with TRACER.span("stt", turn):
+            if self.incremental:
+                transcription = self.incremental.finish(audio)
+            else:
+                transcription = self.transcribe(audio)
+        TRACER.observe("stt_audio_seconds", len(audio) / self.fs, turn)
+        print(f"[SMART] Transcription: {transcription}")
+        if self.is_intended_for_assistant(transcription):
+            return transcription
+        print(f"[SMART] Ignored: {transcription}")
+        return None
 
     def transcribe(self, audio):
-        segments, _ = self.model.transcribe(audio)
+        segments, _ = self.model.transcribe(audio, **self.profile.decode_options)
         return " ".join([seg.text for seg in segments]).strip()
 
     def is_intended_for_assistant(self, text):
@@ -103,7 +229,9 @@ class SmartListener:
 
 
 if __name__ == "__main__":
-    listener = SmartListener(model_size="medium.en", use_vad=True)
+    # Print what Whisper has understood so far while the user is still talking
+    listener = SmartListener(model_size="medium.en", use_vad=True, incremental=True,
+                             on_partial=lambda stable, unstable: print(f"[SMART] Partial: {stable} | {unstable}"))
 
     def on_user_spoke_to_assistant(transcript):
         print(f"[MAIN] User spoke to Jowie: {transcript}")
@@ -0,0 +1,84 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+# Boot orchestration. Slow start-up work (Whisper loads, the Ollama model load, the Kokoro
+# health check) runs on background threads while the main thread does the imports, the device
+# prompt and object construction, and every phase is timed. Only the standard library is
+# imported here so the background work can start before any heavy module is loaded.
+
+def load_whisper(model_size, compute_type="int8", download_root="models/", **options):
+    # Loads into the shared registry, where the listener's LazyWhisperModel will find it
+    from whisperRegistry import REGISTRY
+    REGISTRY.get(model_size, compute_type, download_root=download_root, **options)
+
+
+def preload_ollama(model, host=None, keep_alive="30m"):
+    # An empty generate request makes Ollama load the model and keep it resident
+    import ollama
+    ollama.Client(host=host).generate(model=model, prompt="", keep_alive=keep_alive)
+
+
+def check_kokoro(url=None):
+    from httpClient import get_client
+    from jawieVoice import KOKORO_URL
+    parts = urlsplit(url or KOKORO_URL)
+    get_client("tts", timeout=(2, 30)).get(f"{parts.scheme}://{parts.netloc}/health", timeout=3).raise_for_status()
+
+
+class WarmStart:
+    def __init__(self, workers=4):
+        self.pool = ThreadPoolExecutor(workers, thread_name_prefix="warm-start")
+        self.started = time.perf_counter()
+        self.lock = threading.Lock()
+        self.timings = {}  # phase -> (start offset, duration), both in seconds
+        self.tasks = {}    # background phase -> future
+
+    def run(self, phase, func, *args, **kwargs):
+        # Starts a phase in the background
+        self.tasks[phase] = self.pool.submit(self._timed, phase, func, *args, **kwargs)
+        return self.tasks[phase]
+
+    @contextmanager
+    def phase(self, name):
+        # Times a phase on the calling thread
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(name, started)
+
+    def _timed(self, phase, func, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self._record(phase, started)
+
+    def _record(self, phase, started):
+        with self.lock:
+            self.timings[phase] = (started - self.started, time.perf_counter() - started)
+
+    def wait(self, *phases):
+        # Blocks until the given background phases are done. A failed phase is reported,
+        # not raised: the assistant still starts, and the component retries on first use.
+        for phase in phases:
+            try:
+                self.tasks[phase].result()
+            except Exception as e:
+                print(f"[BOOT] {phase} failed: {e}")
+
+    def report(self):
+        with self.lock:
+            timings = sorted(self.timings.items(), key=lambda item: item[1][0])
+        print(f"[BOOT] Ready in {time.perf_counter() - self.started:.2f}s")
+        for phase, (offset, duration) in timings:
+            print(f"[BOOT]   {phase:<20} {offset:6.2f}s -> {offset + duration:6.2f}s  ({duration:.2f}s)")
+        for phase, future in self.tasks.items():
+            if not future.done():
+                print(f"[BOOT]   {phase:<20} still running")
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False)
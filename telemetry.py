@@ -0,0 +1,195 @@
+import itertools
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Per-turn latency tracing. Each turn gets an ID when the endpoint is detected; every stage
+# (STT, LLM, tools, TTS, playback) records events and timings against that ID, and the
+# timings feed in-process histograms that can be dumped as JSON or scraped by Prometheus.
+# While disabled every call returns right away, so the hooks can stay in the hot paths.
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+
+    def to_dict(self):
+        return {"count": self.count, "sum": round(self.sum, 6),
+                "mean": round(self.sum / self.count, 6) if self.count else None,
+                "buckets": dict(zip([*map(str, self.buckets), "+Inf"], itertools.accumulate(self.counts)))}
+
+
+class _NoSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class _Span:
+    def __init__(self, tracer, name, turn):
+        self.tracer = tracer
+        self.name = name
+        self.turn = turn
+
+    def __enter__(self):
+        self.start = time.monotonic()
+        self.tracer.event(f"{self.name}_start", self.turn)
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.event(f"{self.name}_end", self.turn)
+        self.tracer.observe(f"{self.name}_seconds", time.monotonic() - self.start, self.turn)
+        return False
+
+
+NO_SPAN = _NoSpan()
+
+
+class Tracer:
+    def __init__(self, enabled=False, keep_turns=50):
+        self.enabled = enabled
+        self.keep_turns = keep_turns
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+        self.histograms = {}
+        self.counters = {}
+        self.turns = OrderedDict()  # turn id -> {"events": {name: monotonic time}, "values": {...}}
+        self.current_turn = None
+
+    def new_turn(self):
+        if not self.enabled:
+            return None
+        turn = next(self.ids)
+        with self.lock:
+            self.turns[turn] = {"events": {}, "values": {}}
+            while len(self.turns) > self.keep_turns:
+                self.turns.popitem(last=False)
+            self.current_turn = turn
+        self.event("silence_detected", turn)
+        return turn
+
+    def event(self, name, turn=None, once=False):
+        # Marks a point in time of a turn; with once=True only the first occurrence counts
+        if not self.enabled or turn is None:
+            return
+        now = time.monotonic()
+        with self.lock:
+            record = self.turns.get(turn)
+            if record is None or (once and name in record["events"]):
+                return
+            record["events"][name] = now
+            start = record["events"].get("silence_detected")
+        if name == "first_audio" and start is not None:
+            self.observe("turn_first_audio_seconds", now - start, turn)
+
+    def span(self, name, turn=None):
+        if not self.enabled:
+            return NO_SPAN
+        return _Span(self, name, turn)
+
+    def observe(self, name, value, turn=None):
+        if not self.enabled:
+            return
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(value)
+            record = self.turns.get(turn)
+            if record is not None:
+                record["values"][name] = value
+
+    def count(self, name, value=1, turn=None):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+            record = self.turns.get(turn)
+            if record is not None:
+                record["values"][name] = record["values"].get(name, 0) + value
+
+    def snapshot(self):
+        with self.lock:
+            turns = {}
+            for turn, record in self.turns.items():
+                events = record["events"]
+                origin = min(events.values()) if events else 0.0
+                turns[turn] = {"events": {name: round(t - origin, 4) for name, t in sorted(events.items(), key=lambda e: e[1])},
+                               "values": dict(record["values"])}
+            return {"histograms": {name: h.to_dict() for name, h in sorted(self.histograms.items())},
+                    "counters": dict(sorted(self.counters.items())),
+                    "turns": turns}
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def dump(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.to_json())
+
+    def to_prometheus(self, prefix="jawie"):
+        lines = []
+        with self.lock:
+            for name, h in sorted(self.histograms.items()):
+                metric = f"{prefix}_{name}"
+                lines.append(f"# TYPE {metric} histogram")
+                for bound, total in zip([*map(str, h.buckets), "+Inf"], itertools.accumulate(h.counts)):
+                    lines.append(f'{metric}_bucket{{le="{bound}"}} {total}')
+                lines.append(f"{metric}_sum {h.sum}")
+                lines.append(f"{metric}_count {h.count}")
+            for name, value in sorted(self.counters.items()):
+                metric = f"{prefix}_{name}_total"
+                lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port=9464, host="127.0.0.1"):
+        # /metrics in Prometheus text format, /metrics.json with the per-turn breakdown
+        tracer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/metrics":
+                    body, content_type = tracer.to_prometheus(), "text/plain; version=0.0.4"
+                elif self.path == "/metrics.json":
+                    body, content_type = tracer.to_json(), "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        print(f"[TRACE] Metrics on http://{host}:{port}/metrics")
+        return server
+
+
+TRACER = Tracer(enabled=os.environ.get("JAWIE_TRACE") == "1")
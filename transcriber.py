@@ -1,18 +1,19 @@
 import numpy as np
 import sounddevice as sd
-import json
-from pathlib import Path
-from faster_whisper import WhisperModel
-
-SETTINGS_FILE = Path("settings.json")
+from settings import load_settings, update_settings
+from whisperRegistry import LazyWhisperModel
+from decodeProfiles import load_profile
 
 class Transcriber:
-    def __init__(self, model_size="large-v3", model_path="models/", device_idx=None):
+    def __init__(self, model_size="large-v3", model_path="models/", device_idx=None, decode_profile="dictation"):
         self.fs = 16000
-        self.model = WhisperModel(
+        self.profile = load_profile(decode_profile)
+        # Loaded on the first transcription, and shared with any other component using the same model
+        self.model = LazyWhisperModel(
             model_size,
             compute_type="int8",          # Faster + lower RAM
-            download_root=model_path
+            download_root=model_path,
+            **self.profile.load_options
         )
         self.device = device_idx or self.load_device()
 
@@ -29,12 +30,10 @@ class Transcriber:
         self.save_device(choice)
 
     def save_device(self, index: int):
-        SETTINGS_FILE.write_text(json.dumps({"input_device": index}))
+        update_settings(input_device=index)
 
     def load_device(self):
-        if SETTINGS_FILE.exists():
-            return json.loads(SETTINGS_FILE.read_text()).get("input_device", None)
-        return None
+        return load_settings().get("input_device")
 
     def record_audio(self, duration: float = 5.0) -> np.ndarray:
         if self.device is None:
@@ -46,11 +45,18 @@ class Transcriber:
 
     def transcribe(self, audio: np.ndarray) -> str:
         print("[STT] Transcribing...")
-        segments, _ = self.model.transcribe(audio)
+        segments, _ = self.model.transcribe(audio, **self.profile.decode_options)
         full_text = " ".join([seg.text for seg in segments])
         print(f"[STT] Transcribed: {full_text.strip()}")
         return full_text.strip()
 
+    def transcribe_files(self, inputs, output="transcripts.jsonl", workers=None, batch_size=8):
+        # Bulk mode for recordings: see batchTranscriber, runs the same model in a process pool
+        from batchTranscriber import transcribe_batch
+        return transcribe_batch(inputs, output, model_size=self.model.model_size, compute_type=self.model.compute_type,
+                                device=self.model.device, workers=workers, batch_size=batch_size,
+                                model_path=self.model.download_root)
+
 
 if __name__ == "__main__":
     transcriber = Transcriber()
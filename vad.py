@@ -2,23 +2,74 @@ import webrtcvad
 import numpy as np
 
 class VoiceActivityDetector:
-    def __init__(self, sample_rate=16000, aggressiveness=2):
+    def __init__(self, sample_rate=16000, aggressiveness=2, energy_threshold_db=-55.0, hiss_zcr=0.6,
+                 onset_frames=2, hangover_frames=8):
         self.vad = webrtcvad.Vad(aggressiveness)
         self.sample_rate = sample_rate
         self.frame_duration = 30  # ms
         self.frame_size = int(sample_rate * self.frame_duration / 1000)
+        # Pre-gate: frames quieter than this, or quiet-ish with a noise-like zero-crossing rate,
+        # are silent for sure and never reach webrtcvad
+        self.energy_threshold_db = energy_threshold_db
+        self.hiss_zcr = hiss_zcr
+        # Smoothing: speech starts after `onset_frames` voiced frames in a row and
+        # lasts until `hangover_frames` unvoiced frames in a row
+        self.onset_frames = onset_frames
+        self.hangover_frames = hangover_frames
+        self.reset()
 
-    def is_speech(self, audio):
+    def reset(self):
+        self.remainder = np.zeros(0, dtype=np.float32)  # partial frame carried to the next call
+        self.voiced_run = 0
+        self.hangover = 0
+        self.in_speech = False
+
+    def frame_mask(self, audio):
+        # Returns the smoothed per-frame speech mask for this chunk and the fraction of speech frames
         if len(audio.shape) > 1:
             audio = audio[:, 0]  # mono only
 
-        # Convert to 16-bit PCM
-        int16_audio = (audio * 32768).astype(np.int16)
-        raw_bytes = int16_audio.tobytes()
+        audio = np.concatenate((self.remainder, audio)) if len(self.remainder) else audio
+        n_frames = len(audio) // self.frame_size
+        frames = audio[:n_frames * self.frame_size].reshape(n_frames, self.frame_size)
+        self.remainder = audio[n_frames * self.frame_size:].astype(np.float32)
+
+        energy_db = 10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-12)
+        zcr = np.mean(np.signbit(frames[:, 1:]) != np.signbit(frames[:, :-1]), axis=1)
+        candidates = (energy_db >= self.energy_threshold_db) & ~(
+            (energy_db < self.energy_threshold_db + 10) & (zcr > self.hiss_zcr))
+
+        # Convert to 16-bit PCM, only the frames webrtcvad has to look at
+        voiced = np.zeros(n_frames, dtype=bool)
+        pcm = np.clip(frames[candidates] * 32768, -32768, 32767).astype(np.int16)
+        for row, i in zip(pcm, np.flatnonzero(candidates)):
+            voiced[i] = self.vad.is_speech(row.tobytes(), self.sample_rate)
 
-        # Break into 30ms chunks and test each
-        for i in range(0, len(raw_bytes) - self.frame_size * 2, self.frame_size * 2):
-            frame = raw_bytes[i:i + self.frame_size * 2]
-            if self.vad.is_speech(frame, self.sample_rate):
-                return True
-        return False
+        mask = self._smooth(voiced)
+        ratio = float(mask.mean()) if n_frames else 0.0
+        return mask, ratio
+
+    def _smooth(self, voiced):
+        mask = np.zeros(len(voiced), dtype=bool)
+        for i, v in enumerate(voiced):
+            if not self.in_speech:
+                self.voiced_run = self.voiced_run + 1 if v else 0
+                if self.voiced_run >= self.onset_frames:
+                    self.in_speech = True
+                    self.hangover = self.hangover_frames
+                    mask[max(0, i - self.onset_frames + 1):i + 1] = True
+            elif v:
+                self.hangover = self.hangover_frames
+                mask[i] = True
+            else:
+                self.hangover -= 1
+                if self.hangover <= 0:
+                    self.in_speech = False
+                    self.voiced_run = 0
+                else:
+                    mask[i] = True
+        return mask
+
+    def is_speech(self, audio):
+        mask, _ = self.frame_mask(audio)
+        return bool(mask.any())
@@ -2,8 +2,71 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import sounddevice as sd
 import numpy as np
-import noisereduce as nr
-from scipy.io.wavfile import write
+import threading
+import wave
+from audioFrontend import AudioFrontend
+from ringBuffer import SampleQueue
+
+METER_FPS = 30
+
+
+class LevelMeter:
+    # Written by the audio callback, read by the UI poll. Plain float stores, no locks: the
+    # loudest block since the last read is kept so short bursts still show up on the bar.
+    def __init__(self):
+        self.rms = 0.0
+
+    def update(self, block):
+        rms = float(np.sqrt(np.mean(block ** 2))) if len(block) else 0.0
+        if rms > self.rms:
+            self.rms = rms
+
+    def read(self):
+        rms, self.rms = self.rms, 0.0
+        return rms
+
+
+class RecordingWriter:
+    # Drains a SampleQueue to disk on its own thread, so a recording never sits in memory.
+    # FLAC needs the soundfile package; WAV falls back to the standard library.
+    def __init__(self, path, sample_rate, queue):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.queue = queue
+        self.stopping = threading.Event()
+        self.frames = 0
+        try:
+            import soundfile as sf
+            self.file = sf.SoundFile(path, mode="w", samplerate=sample_rate, channels=1, subtype="PCM_16")
+            self.write = lambda block: self.file.write(block)
+        except ImportError:
+            if not path.lower().endswith(".wav"):
+                raise RuntimeError("Install the soundfile package to record FLAC")
+            self.file = wave.open(path, "wb")
+            self.file.setnchannels(1)
+            self.file.setsampwidth(2)
+            self.file.setframerate(sample_rate)
+            self.write = lambda block: self.file.writeframes((np.clip(block, -1, 1) * 32767).astype(np.int16).tobytes())
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def _run(self):
+        while not self.stopping.is_set() or self.queue.available():
+            block = self.queue.pop(self.sample_rate)
+            if len(block):
+                self.write(block)
+                self.frames += len(block)
+            else:
+                self.stopping.wait(0.05)
+        self.file.close()
+
+    def stop(self):
+        self.stopping.set()
+        self.thread.join()
+
 
 class NoiseMonitorApp:
     def __init__(self, root):
@@ -27,9 +90,16 @@ class NoiseMonitorApp:
 
         # Noise reduction checkbox
         self.noise_reduction_var = tk.BooleanVar()
-        self.noise_reduction_checkbox = tk.Checkbutton(root, text="Enable Noise Reduction", variable=self.noise_reduction_var)
+        self.noise_reduction_checkbox = tk.Checkbutton(root, text="Enable Noise Reduction", variable=self.noise_reduction_var,
+                                                       command=self.read_controls)
         self.noise_reduction_checkbox.pack(pady=10)
 
+        # Automatic gain checkbox
+        self.auto_gain_var = tk.BooleanVar()
+        self.auto_gain_checkbox = tk.Checkbutton(root, text="Enable Auto Gain", variable=self.auto_gain_var,
+                                                 command=self.read_controls)
+        self.auto_gain_checkbox.pack(pady=10)
+
         # Noise level bar
         self.db_label = tk.Label(root, text="Noise Level: -∞ dB")
         self.db_label.pack()
@@ -49,15 +119,26 @@ class NoiseMonitorApp:
         self.stop_record_button = tk.Button(root, text="Stop Recording", command=self.stop_recording, state="disabled")
         self.stop_record_button.pack(pady=10)
 
-        # Export button
-        self.export_button = tk.Button(root, text="Export Recording", command=self.export_recording, state="disabled")
-        self.export_button.pack(pady=10)
-
         self.stream = None
         self.running = False
         self.recording = False
-        self.audio_buffer = []
         self.sample_rate = 16000
+        self.frontend = AudioFrontend(self.sample_rate)
+        self.meter = LevelMeter()
+        self.record_queue = SampleQueue(self.sample_rate * 10)  # 10 s of slack for the writer thread
+        self.writer = None
+        self.dropped_before = 0
+        # Plain copies of the controls for the audio callback, which must not call into Tk
+        self.gain = 1.0
+        self.noise_reduction = False
+        self.auto_gain = False
+        self.gain_slider.config(command=lambda _: self.read_controls())
+
+    def read_controls(self):
+        # UI thread only: the controls' commands call this whenever they change
+        self.gain = float(self.gain_slider.get())
+        self.noise_reduction = self.noise_reduction_var.get()
+        self.auto_gain = self.auto_gain_var.get()
 
     def start_monitoring(self):
         selected_device = self.device_dropdown.get()
@@ -75,11 +156,18 @@ class NoiseMonitorApp:
         self.start_button.config(state="disabled")
         self.stop_button.config(state="normal")
 
+        # Fresh noise estimate for the new device
+        self.frontend.reset()
+        self.read_controls()
+
         # Start audio stream
         self.stream = sd.InputStream(device=device_idx, channels=1, samplerate=self.sample_rate, callback=self.audio_callback)
         self.stream.start()
+        self.poll_meter()
 
     def stop_monitoring(self):
+        if self.recording:
+            self.stop_recording()
         self.running = False
         if self.stream:
             self.stream.stop()
@@ -93,55 +181,60 @@ class NoiseMonitorApp:
         if not self.running:
             messagebox.showerror("Error", "Start monitoring before recording.")
             return
+        file_path = filedialog.asksaveasfilename(defaultextension=".wav",
+                                                 filetypes=[("WAV files", "*.wav"), ("FLAC files", "*.flac")])
+        if not file_path:
+            return
+        try:
+            self.record_queue.pop()  # discard anything left from a previous recording
+            self.dropped_before = self.record_queue.dropped
+            self.writer = RecordingWriter(file_path, self.sample_rate, self.record_queue).start()
+        except (RuntimeError, OSError) as e:
+            messagebox.showerror("Error", str(e))
+            return
         self.recording = True
-        self.audio_buffer = []
         self.record_button.config(state="disabled")
         self.stop_record_button.config(state="normal")
 
     def stop_recording(self):
         self.recording = False
+        self.writer.stop()
         self.record_button.config(state="normal")
         self.stop_record_button.config(state="disabled")
-        self.export_button.config(state="normal")
-
-    def export_recording(self):
-        if not self.audio_buffer:
-            messagebox.showerror("Error", "No recording to export.")
-            return
-        file_path = filedialog.asksaveasfilename(defaultextension=".wav", filetypes=[("WAV files", "*.wav")])
-        if file_path:
-            audio_data = np.concatenate(self.audio_buffer)
-            write(file_path, self.sample_rate, (audio_data * 32767).astype(np.int16))
-            messagebox.showinfo("Export", f"Recording saved to {file_path}")
+        dropped = self.record_queue.dropped - self.dropped_before
+        dropped = f" ({dropped} samples dropped)" if dropped else ""
+        messagebox.showinfo("Recording", f"Recording saved to {self.writer.path}{dropped}")
 
     def audio_callback(self, indata, frames, time, status):
         if not self.running:
             return
 
         # Apply gain
-        gain = self.gain_slider.get()
-        indata = indata * gain
+        indata = indata[:, 0] * self.gain
 
-        # Apply noise reduction if enabled
-        if self.noise_reduction_var.get():
-            indata = nr.reduce_noise(y=indata.flatten(), sr=self.sample_rate, y_noise=indata[:self.sample_rate].flatten())
+        # Streaming noise suppression and gain control, both keep their state between blocks
+        if self.noise_reduction:
+            indata = self.frontend.suppress_noise(indata)
+        if self.auto_gain:
+            indata = self.frontend.normalize(indata)
 
-        # Calculate RMS (Root Mean Square) for noise level
-        rms = np.sqrt(np.mean(indata**2))
-        if rms > 0:
-            db = 20 * np.log10(rms)
-        else:
-            db = -np.inf
+        # Never touch Tk from the audio thread: the UI polls the meter at a fixed frame rate
+        self.meter.update(indata)
 
-        # Scale RMS to fit canvas width
-        noise_level = min(int(rms * 600), 600)
+        # Hand the block to the writer thread if recording is enabled
+        if self.recording:
+            self.record_queue.push(indata)
 
-        # Update the noise level bar and dB label
-        self.root.after(0, self.update_bar, noise_level, db)
+    def poll_meter(self):
+        if not self.running:
+            return
+        rms = self.meter.read()
+        db = 20 * np.log10(rms) if rms > 0 else -np.inf
 
-        # Record audio if recording is enabled
-        if self.recording:
-            self.audio_buffer.append(indata.copy())
+        # Scale RMS to fit canvas width
+        noise_level = min(int(rms * 600), 600)
+        self.update_bar(noise_level, db)
+        self.root.after(1000 // METER_FPS, self.poll_meter)
 
     def update_bar(self, noise_level, db):
         self.canvas.coords(self.bar, 0, 0, noise_level, 50)
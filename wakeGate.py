@@ -0,0 +1,50 @@
+import re
+import difflib
+from whisperRegistry import LazyWhisperModel
+
+# Cheap first stage in front of the full Whisper decode: a tiny model listens to only the
+# first couple of seconds of an utterance, primed with the assistant's names, and decides
+# whether the utterance is worth a full transcription at all.
+
+
+class WakeWordGate:
+    def __init__(self, aliases, patterns=(), model_size="tiny.en", model_path="models/", window=2.0, fs=16000,
+                 min_similarity=0.75):
+        self.aliases = list(aliases)
+        self.patterns = [re.compile(p) for p in patterns]
+        self.model = LazyWhisperModel(model_size, compute_type="int8", download_root=model_path)
+        self.window = int(window * fs)
+        self.min_similarity = min_similarity
+        # Whisper has no hard vocabulary constraint; priming the decoder with the real name (the
+        # first alias) biases it towards that spelling. Lookalikes are left out of the prompt so
+        # they are not suggested, mentions_alias() still accepts them when Whisper hears them.
+        self.prompt = f"Hey {self.aliases[0].capitalize()}." if self.aliases else "Hey Jowie."
+        self.accepted = 0
+        self.rejected = 0
+
+    def accepts(self, audio):
+        segments, _ = self.model.transcribe(
+            audio[:self.window],
+            beam_size=1,
+            temperature=0.0,
+            language="en",
+            without_timestamps=True,
+            condition_on_previous_text=False,
+            initial_prompt=self.prompt,
+        )
+        text = " ".join(seg.text for seg in segments).lower().strip()
+
+        passed = self.mentions_alias(text) or any(p.search(text) for p in self.patterns)
+        if passed:
+            self.accepted += 1
+        else:
+            self.rejected += 1
+        print(f"[WAKE] {'Accepted' if passed else 'Rejected'}: {text!r} "
+              f"({self.accepted} accepted, {self.rejected} rejected)")
+        return passed
+
+    def mentions_alias(self, text):
+        for word in re.findall(r"[a-z']+", text):
+            if difflib.get_close_matches(word, self.aliases, n=1, cutoff=self.min_similarity):
+                return True
+        return False
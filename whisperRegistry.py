@@ -0,0 +1,103 @@
+import threading
+import time
+
+# Process-wide cache of Whisper models keyed by size, compute type, device and load options.
+# Components hold a LazyWhisperModel handle; the real model is only loaded on first use and
+# the same instance is shared by everything asking for the same configuration.
+
+
+class WhisperRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()  # guards the dicts only, never held while a model loads
+        self.models = {}     # key -> WhisperModel
+        self.loading = {}    # key -> Lock held by the thread loading that model
+        self.last_used = {}  # key -> time.monotonic() of the last get()
+        self.reaper = None
+
+    def get(self, model_size, compute_type="int8", device="auto", download_root="models/", **options):
+        key = self.key(model_size, compute_type, device, **options)
+        with self.lock:
+            model = self.models.get(key)
+            if model is not None:
+                self.last_used[key] = time.monotonic()
+                return model
+            loading = self.loading.setdefault(key, threading.Lock())
+
+        # Different models load in parallel; callers wanting the same one wait for its load
+        with loading:
+            with self.lock:
+                model = self.models.get(key)
+            if model is None:
+                from faster_whisper import WhisperModel  # heavy import, only paid when a model is really needed
+                print(f"[STT] Loading Whisper {model_size} ({compute_type}, {device})...")
+                started = time.perf_counter()
+                model = WhisperModel(model_size, device=device, compute_type=compute_type,
+                                     download_root=download_root, **options)
+                print(f"[STT] Loaded Whisper {model_size} in {time.perf_counter() - started:.1f}s")
+            with self.lock:
+                self.models[key] = model
+                self.last_used[key] = time.monotonic()
+                self.loading.pop(key, None)
+        return model
+
+    @staticmethod
+    def key(model_size, compute_type="int8", device="auto", **options):
+        return (model_size, compute_type, device, tuple(sorted(options.items())))
+
+    def is_loaded(self, key):
+        with self.lock:
+            return key in self.models
+
+    def unload(self, key):
+        with self.lock:
+            self.last_used.pop(key, None)
+            return self.models.pop(key, None) is not None
+
+    def unload_idle(self, max_idle):
+        # Drops models nobody asked for in `max_idle` seconds. Decodes still running keep
+        # their own reference, so this never pulls a model out from under a transcription.
+        now = time.monotonic()
+        with self.lock:
+            idle = [key for key, used in self.last_used.items() if now - used >= max_idle]
+            for key in idle:
+                print(f"[STT] Unloading idle Whisper {key[0]} ({key[1]}, {key[2]})")
+                del self.models[key]
+                del self.last_used[key]
+        return idle
+
+    def start_reaper(self, max_idle=600.0, interval=60.0):
+        if self.reaper:
+            return
+
+        def reap():
+            while True:
+                time.sleep(interval)
+                self.unload_idle(max_idle)
+
+        self.reaper = threading.Thread(target=reap, daemon=True)
+        self.reaper.start()
+
+
+REGISTRY = WhisperRegistry()
+
+
+class LazyWhisperModel:
+    # Drop-in for WhisperModel.transcribe that resolves the shared model on every call,
+    # so an unloaded model is transparently loaded again the next time it is needed.
+    def __init__(self, model_size, compute_type="int8", device="auto", download_root="models/", registry=REGISTRY, **options):
+        self.model_size = model_size
+        self.compute_type = compute_type
+        self.device = device
+        self.download_root = download_root
+        self.options = options
+        self.registry = registry
+
+    @property
+    def key(self):
+        return self.registry.key(self.model_size, self.compute_type, self.device, **self.options)
+
+    def load(self):
+        return self.registry.get(self.model_size, self.compute_type, self.device, self.download_root, **self.options)
+
+    def transcribe(self, audio, **kwargs):
+        return self.load().transcribe(audio, **kwargs)